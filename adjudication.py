@@ -0,0 +1,95 @@
+"""
+Resign, draw and tablebase adjudication for harness games, so lost endgames and dead draws are not played out.
+Scores are in centipawns from White's point of view, as reported by the engines for the move they just played;
+the players convert their engine's own scale (see harness.play_game), so one threshold fits every engine.
+"""
+import chess
+import chess.syzygy
+
+# Tablebases opened by this process, keyed by directory
+tablebases = {}
+
+def open_tablebase(directory):
+    if directory not in tablebases:
+        tablebases[directory] = chess.syzygy.open_tablebase(directory)
+    return tablebases[directory]
+
+class Adjudicator:
+    """
+    Resign when both engines agree the score is beyond resign_score for resign_moves moves each, draw when
+    both keep |score| within draw_score for draw_moves moves each once draw_after moves have been played, and
+    use the Syzygy tablebases in syzygy_directory once few enough pieces are left.
+    """
+    def __init__(self, resign_score=1000, resign_moves=3, draw_score=10, draw_moves=8, draw_after=40,
+                 syzygy_directory=None, syzygy_pieces=5):
+        self.resign_score = resign_score
+        self.resign_moves = resign_moves
+        self.draw_score = draw_score
+        self.draw_moves = draw_moves
+        self.draw_after = draw_after
+        self.syzygy_directory = syzygy_directory
+        self.syzygy_pieces = syzygy_pieces
+        self.reset()
+
+    def reset(self):
+        self.resign_count = 0
+        self.resign_sign = 0
+        self.draw_count = 0
+
+    def adjudicate_tablebase(self, board):
+        if self.syzygy_directory is None or chess.popcount(board.occupied) > self.syzygy_pieces:
+            return None
+        if board.castling_rights:
+            return None
+        try:
+            wdl = open_tablebase(self.syzygy_directory).probe_wdl(board)
+        except (KeyError, chess.syzygy.MissingTableError):
+            return None
+        if wdl in (-1, 0, 1):  # Draws, including cursed wins and blessed losses
+            return '1/2-1/2'
+        winner = board.turn if wdl > 0 else not board.turn
+        return '1-0' if winner == chess.WHITE else '0-1'
+
+    def adjudicate(self, board, score):
+        """
+        Called after each move with the score of the engine that played it (None if it has no score, e.g.
+        a book move). Returns the adjudicated result or None to keep playing.
+        """
+        result = self.adjudicate_tablebase(board)
+        if result:
+            return result
+        if score is None:
+            self.reset()
+            return None
+
+        sign = 1 if score >= self.resign_score else -1 if score <= -self.resign_score else 0
+        if sign and sign == self.resign_sign:
+            self.resign_count += 1
+        else:
+            self.resign_sign = sign
+            self.resign_count = 1 if sign else 0
+        if self.resign_count >= 2 * self.resign_moves:
+            return '1-0' if sign > 0 else '0-1'
+
+        if board.fullmove_number > self.draw_after and abs(score) <= self.draw_score:
+            self.draw_count += 1
+        else:
+            self.draw_count = 0
+        if self.draw_count >= 2 * self.draw_moves:
+            return '1/2-1/2'
+        return None
+
+def add_adjudication_arguments(parser):
+    group = parser.add_argument_group("adjudication")
+    group.add_argument('--adjudicate', action='store_true', help="adjudicate resigns, draws and tablebase positions")
+    group.add_argument('--resign-score', type=int, default=1000, help="centipawns both engines must agree on to resign")
+    group.add_argument('--resign-moves', type=int, default=3, help="moves each side must stay beyond the resign score")
+    group.add_argument('--draw-score', type=int, default=10, help="max |centipawns| for a draw")
+    group.add_argument('--draw-moves', type=int, default=8, help="moves each side must stay within the draw score")
+    group.add_argument('--draw-after', type=int, default=40, help="earliest move number for draw adjudication")
+    group.add_argument('--syzygy', help="Syzygy tablebase directory for tablebase adjudication")
+
+def adjudicator_from_args(args):
+    if not args.adjudicate:
+        return None
+    return Adjudicator(args.resign_score, args.resign_moves, args.draw_score, args.draw_moves, args.draw_after, args.syzygy)
@@ -65,18 +65,19 @@ piece_square_table = {
     ]
 }
 
-def minimax(depth, maximizingPlayer, alpha, beta, board):
+def minimax(depth, maximizingPlayer, alpha, beta, board, ordered=False):
     if depth == 0 or board.is_game_over():
         eval = evaluate_board(board)
         return eval, None
 
     best_move = None
+    moves = order_moves(board) if ordered else board.legal_moves
 
     if maximizingPlayer:
         best = MIN
-        for move in board.legal_moves:
+        for move in moves:
             board.push(move)
-            val, _ = minimax(depth - 1, False, alpha, beta, board)
+            val, _ = minimax(depth - 1, False, alpha, beta, board, ordered)
             board.pop()
             if val > best:
                 best = val
@@ -86,9 +87,9 @@ def minimax(depth, maximizingPlayer, alpha, beta, board):
                 break
     else:
         best = MAX
-        for move in board.legal_moves:
+        for move in moves:
             board.push(move)
-            val, _ = minimax(depth - 1, True, alpha, beta, board)
+            val, _ = minimax(depth - 1, True, alpha, beta, board, ordered)
             board.pop()
             if val < best:
                 best = val
@@ -115,3 +116,30 @@ def get_piece_value(piece):
         chess.KING: 20000
     }
     return values[piece.piece_type] if piece.color == chess.WHITE else -values[piece.piece_type]
+
+def order_moves(board):
+    """
+    Order the moves based on their priority: captures, checks, promotions, and then quiet moves.
+    """
+    move_scores = []
+    for move in board.legal_moves:
+        if board.is_capture(move):
+            # Assign higher score for capturing higher-value pieces
+            captured_piece = board.piece_at(move.to_square)
+            if captured_piece:
+                score = get_piece_value(captured_piece) * 10  # Arbitrary multiplier to prioritize captures
+            else:
+                score = 100  # Default capture score
+        elif board.gives_check(move):
+            score = 50  # Arbitrary score for checks
+        elif move.promotion:
+            score = 75  # Arbitrary score for promotions
+        else:
+            score = 10  # Lower score for quiet moves
+        move_scores.append((score, move))
+
+    # Sort moves by their scores in descending order
+    move_scores.sort(reverse=True, key=lambda x: x[0])
+    ordered_moves = [move for score, move in move_scores]
+
+    return ordered_moves
@@ -0,0 +1,315 @@
+import inspect
+import time
+import zlib
+import chess
+import chess.syzygy
+from profiling import profiled
+from searchstats import SearchStats
+from ttable import EXACT, LOWER, UPPER, position_key
+
+# Initialize Syzygy tablebases
+tablebase = chess.syzygy.Tablebase()
+
+MAX, MIN = 10000, -10000  # Use more realistic values for MAX and MIN
+tablebase_win = MAX - 1000  # A won tablebase position: below any mate, beyond any realistic material balance
+decisive_cp = 10000  # centipawns() of a mate or tablebase win
+
+stats = SearchStats()  # Of the running or last search, replaced by search()
+deadline = None  # time.time() at which a running search gives up, None for no limit
+node_limit = None  # Nodes after which a running search gives up, None for no limit
+stop_requested = False  # Set from another thread to stop a running search, cleared by whoever starts the next one
+transposition_table = None  # ttable.TranspositionTable used by every search of this process, None for none
+eval_cache = None  # ttable.EvalCache of leaf evaluations, None for none
+
+class SearchTimeout(Exception):
+    pass
+
+piece_square_table = {
+    chess.PAWN: [
+        [0,  0,  0,  0,  0,  0,  0,  0],
+        [50, 50, 50, 50, 50, 50, 50, 50],
+        [10, 10, 20, 30, 30, 20, 10, 10],
+        [5,  5, 10, 25, 25, 10,  5,  5],
+        [0,  0,  0, 20, 20,  0,  0,  0],
+        [5, -5,-10,  0,  0,-10, -5,  5],
+        [5, 10, 10,-20,-20, 10, 10,  5],
+        [0,  0,  0,  0,  0,  0,  0,  0]
+    ],
+    chess.KNIGHT: [
+        [-50,-40,-30,-30,-30,-30,-40,-50],
+        [-40,-20,  0,  0,  0,  0,-20,-40],
+        [-30,  0, 10, 15, 15, 10,  0,-30],
+        [-30,  5, 15, 20, 20, 15,  5,-30],
+        [-30,  0, 15, 20, 20, 15,  0,-30],
+        [-30,  5, 10, 15, 15, 10,  5,-30],
+        [-40,-20,  0,  5,  5,  0,-20,-40],
+        [-50,-40,-30,-30,-30,-30,-40,-50]
+    ],
+    chess.BISHOP: [
+        [-20,-10,-10,-10,-10,-10,-10,-20],
+        [-10,  0,  0,  0,  0,  0,  0,-10],
+        [-10,  0,  5, 10, 10,  5,  0,-10],
+        [-10,  5,  5, 10, 10,  5,  5,-10],
+        [-10,  0, 10, 10, 10, 10,  0,-10],
+        [-10, 10, 10, 10, 10, 10, 10,-10],
+        [-10,  5,  0,  0,  0,  0,  5,-10],
+        [-20,-10,-10,-10,-10,-10,-10,-20]
+    ],
+    chess.ROOK: [
+        [0,  0,  0,  0,  0,  0,  0,  0],
+        [5, 10, 10, 10, 10, 10, 10,  5],
+        [-5,  0,  0,  0,  0,  0,  0, -5],
+        [-5,  0,  0,  0,  0,  0,  0, -5],
+        [-5,  0,  0,  0,  0,  0,  0, -5],
+        [-5,  0,  0,  0,  0,  0,  0, -5],
+        [-5,  0,  0,  0,  0,  0,  0, -5],
+        [0,  0,  0,  5,  5,  0,  0,  0]
+    ],
+    chess.QUEEN: [
+        [-20,-10,-10, -5, -5,-10,-10,-20],
+        [-10,  0,  0,  0,  0,  0,  0,-10],
+        [-10,  0,  5,  5,  5,  5,  0,-10],
+        [-5,  0,  5,  5,  5,  5,  0, -5],
+        [0,  0,  5,  5,  5,  5,  0, -5],
+        [-10,  5,  5,  5,  5,  5,  0,-10],
+        [-10,  0,  5,  0,  0,  0,  0,-10],
+        [-20,-10,-10, -5, -5,-10,-10,-20]
+    ],
+    chess.KING: [
+        [-30,-40,-40,-50,-50,-40,-40,-30],
+        [-30,-40,-40,-50,-50,-40,-40,-30],
+        [-30,-40,-40,-50,-50,-40,-40,-30],
+        [-30,-40,-40,-50,-50,-40,-40,-30],
+        [-20,-30,-30,-40,-40,-30,-30,-20],
+        [-10,-20,-20,-20,-20,-20,-20,-10],
+        [20, 20,  0,  0,  0,  0, 20, 20],
+        [20, 30, 10,  0,  0, 10, 30, 20]
+    ]
+}
+
+def minimax(depth, maximizingPlayer, alpha, beta, board):
+    stats.nodes += 1
+    if stats.nodes % 512 == 0 and (stop_requested or deadline is not None and time.time() > deadline or
+                                   node_limit is not None and stats.nodes >= node_limit):
+        raise SearchTimeout()
+    if depth == 0 or board.is_game_over():
+        stats.seldepth = max(stats.seldepth, len(board.move_stack) - stats.root_ply)
+        if eval_cache is None:
+            return evaluate_board(board), None
+        key = position_key(board)
+        eval_value = eval_cache.probe(key)
+        if eval_value is None:
+            eval_value = evaluate_board(board)
+            eval_cache.store(key, eval_value)
+        else:
+            stats.eval_hits += 1
+        return eval_value, None
+
+    best_move = None
+    tt_move = None
+    if transposition_table is not None:
+        key = position_key(board)
+        stats.tt_probes += 1
+        entry = transposition_table.probe(key)
+        if entry is not None:
+            stats.tt_hits += 1
+            tt_move, tt_score, tt_depth, bound = entry
+            # Never cut at the root, the search must come back with a move. Without a quiescence search the
+            # score swings with the parity of the depth, so only an entry of the same parity is trusted. A deeper
+            # entry of the same parity is, so a shallow search on a warm table can return a deeper result
+            if tt_depth >= depth and (tt_depth - depth) % 2 == 0 and len(board.move_stack) > stats.root_ply:
+                if bound == EXACT or bound == LOWER and tt_score >= beta or bound == UPPER and tt_score <= alpha:
+                    stats.tt_cutoffs += 1
+                    return tt_score, tt_move
+        alpha_original, beta_original = alpha, beta
+    moves = order_moves(board)
+    if tt_move in moves:  # Search the best move of the last visit first
+        moves.remove(tt_move)
+        moves.insert(0, tt_move)
+
+    if maximizingPlayer:
+        best = MIN
+        for index, move in enumerate(moves):
+            board.push(move)
+            val, _ = minimax(depth - 1, False, alpha, beta, board)
+            board.pop()
+            if val > best:
+                best = val
+                best_move = move
+            alpha = max(alpha, best)
+            if beta <= alpha:
+                stats.beta_cutoffs += 1
+                stats.first_move_cutoffs += index == 0
+                break
+    else:
+        best = MAX
+        for index, move in enumerate(moves):
+            board.push(move)
+            val, _ = minimax(depth - 1, True, alpha, beta, board)
+            board.pop()
+            if val < best:
+                best = val
+                best_move = move
+            beta = min(beta, best)
+            if beta <= alpha:
+                stats.beta_cutoffs += 1
+                stats.first_move_cutoffs += index == 0
+                break
+    if transposition_table is not None:
+        bound = UPPER if best <= alpha_original else LOWER if best >= beta_original else EXACT
+        transposition_table.store(key, best_move, best, depth, bound)
+    return best, best_move
+
+@profiled
+def search(board, max_depth, time_manager=None, on_iteration=None, nodes=None):
+    """
+    Iterative deepening up to max_depth, stopping when the time manager (timeman.TimeManager) says so, at
+    its hard deadline, after about nodes nodes or when stop_requested is set. Without a time manager a
+    single search to max_depth. on_iteration(depth, score, move) is called after every completed iteration.
+    Returns (score, move, stats), stats being the SearchStats of this search.
+    """
+    global deadline, node_limit, stats
+    stats = SearchStats(len(board.move_stack))
+    if transposition_table is not None:
+        transposition_table.new_search()
+    maximizing = board.turn == chess.WHITE
+    if time_manager is not None and time_manager.forced(board):
+        return evaluate_board(board), next(iter(board.legal_moves), None), stats
+
+    score, move = None, None
+    ply = len(board.move_stack)
+    deadline = time_manager.deadline if time_manager else None  # Never one left over from before (ponderhit)
+    node_limit = nodes
+    try:
+        if time_manager is None:
+            score, move = minimax(max_depth, maximizing, MIN, MAX, board)
+            stats.end_iteration(max_depth, score, move)
+        else:
+            for depth in range(1, max_depth + 1):
+                score, move = minimax(depth, maximizing, MIN, MAX, board)
+                stats.end_iteration(depth, score, move)
+                if on_iteration:
+                    on_iteration(depth, score, move)
+                if time_manager.iteration_done(move, score if maximizing else -score):
+                    break
+    except SearchTimeout:
+        # The unfinished iteration is thrown away, the previous one was searched completely
+        while len(board.move_stack) > ply:
+            board.pop()
+    finally:
+        deadline = None
+        node_limit = None
+    if move is None:  # Not even depth 1 finished, or the game is already over
+        moves = order_moves(board)
+        move = moves[0] if moves else None
+        score = evaluate_board(board)
+    return score, move, stats
+
+def evaluate_board(board):
+    if board.is_checkmate():
+        return MIN if board.turn else MAX
+
+    # Check for endgame using Syzygy tablebases
+    wdl = probe_tablebase(board)
+    if wdl is not None:
+        stats.tb_hits += 1
+        return tablebase_score(wdl) if board.turn == chess.WHITE else -tablebase_score(wdl)
+    
+    material = sum(get_piece_value(piece) for piece in board.piece_map().values())
+    positional = sum(piece_square_table[piece.piece_type][square // 8][square % 8] * (1 if piece.color == chess.WHITE else -1) for square, piece in board.piece_map().items())
+    
+    # Add a bonus for pawn advancement in the endgame
+    if len(board.piece_map()) <= 10:  # Endgame condition
+        pawn_bonus = 0
+        for square, piece in board.piece_map().items():
+            if piece.piece_type == chess.PAWN:
+                rank = chess.square_rank(square)
+                if piece.color == chess.WHITE:
+                    pawn_bonus += (rank * 10)  # Reward for advancing pawns
+                else:
+                    pawn_bonus -= ((7 - rank) * 10)
+        return material + positional + pawn_bonus
+    
+    return material + positional
+
+def probe_tablebase(board):
+    with tablebase:
+        if not (board.has_castling_rights(chess.WHITE) or board.has_castling_rights(chess.BLACK) or board.has_legal_en_passant()):
+            try:
+                return tablebase.probe_wdl(board)
+            except KeyError:
+                pass
+    return None
+
+def tablebase_score(wdl):
+    """
+    Score of a tablebase result for the side to move. A win the 50-move rule turns into a draw (cursed) is
+    only just better than a draw, and never reads as a mate.
+    """
+    if wdl == 2:
+        return tablebase_win
+    if wdl == -2:
+        return -tablebase_win
+    return wdl
+
+def mate_in(score, stats):
+    """
+    Moves to mate of a search score, positive when White mates and negative when Black does, None when the
+    score isn't a mate. Only a checkmate scores MAX, tablebase wins have their own band (tablebase_win). The
+    search first sees a mate in the iteration as deep as the mate is long.
+    """
+    if abs(score) != MAX:
+        return None
+    plies = next((iteration['depth'] for iteration in stats.iterations if iteration['score'] == score), stats.depth)
+    moves = (plies + 1) // 2
+    return moves if score > 0 else -moves
+
+def centipawns(score, board):
+    """
+    A search score on the usual pawn scale, for reports and adjudication. The search values a queen at 5000,
+    so the queens on board (the position the score's line starts from) are counted at 900 instead; queen
+    trades further down the line are not seen. Decisive scores (mate, tablebase) become +-decisive_cp.
+    """
+    if abs(score) >= tablebase_win:
+        return decisive_cp if score > 0 else -decisive_cp
+    queens = len(board.pieces(chess.QUEEN, chess.WHITE)) - len(board.pieces(chess.QUEEN, chess.BLACK))
+    return score - queens * (get_piece_value(chess.Piece(chess.QUEEN, chess.WHITE)) - 900)
+
+def evaluation_hash():
+    """
+    Fingerprint of the static evaluation, so a hash file filled by another version of it isn't trusted.
+    """
+    source = ''.join(inspect.getsource(function) for function in (evaluate_board, get_piece_value, probe_tablebase,
+                                                                   tablebase_score))
+    return zlib.crc32((source + repr(piece_square_table) + repr(tablebase_win)).encode())
+
+def get_piece_value(piece):
+    values = {
+        chess.PAWN: 100,
+        chess.KNIGHT: 320,
+        chess.BISHOP: 330,
+        chess.ROOK: 500,
+        chess.QUEEN: 5000,
+        chess.KING: 30000
+    }
+    return values[piece.piece_type] if piece.color == chess.WHITE else -values[piece.piece_type]
+
+def order_moves(board):
+    """
+    Order the moves based on their priority: captures, checks, promotions, and then quiet moves.
+    """
+    move_scores = []
+    for move in board.legal_moves:
+        if board.gives_check(move):
+            score = 50  # Arbitrary score for checks
+        elif move.promotion:
+            score = 75  # Arbitrary score for promotions
+        else:
+            score = 10  # Lower score for quiet moves
+        move_scores.append((score, move))
+
+    # Sort moves by their scores in descending order
+    move_scores.sort(reverse=True, key=lambda x: x[0])
+    ordered_moves = [move for score, move in move_scores]
+
+    return ordered_moves
@@ -0,0 +1,140 @@
+"""
+Client for analysis_server.py, and a load test for it.
+
+    python analysis_client.py analyse "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3" --movetime 2 --stream
+    python analysis_client.py status
+    python analysis_client.py cancel 17
+    python analysis_client.py load --requests 200 --concurrency 16 --movetime 0.2   # Bench positions
+"""
+import argparse
+import concurrent.futures
+import http.client
+import json
+import socket
+import time
+from bench import bench_positions
+from latency import percentile
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+class AnalysisClient:
+    def __init__(self, host='127.0.0.1', port=8170, unix_path=None, timeout=60):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.timeout = timeout
+
+    def connection(self):
+        if self.unix_path:
+            return UnixHTTPConnection(self.unix_path, self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, data=None):
+        connection = self.connection()
+        try:
+            body = json.dumps(data) if data is not None else None
+            connection.request(method, path, body, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            return response.status, json.loads(response.read() or b'null')
+        finally:
+            connection.close()
+
+    def analyse(self, fen, movetime=None, depth=None, nodes=None, request_id=None):
+        request = {'fen': fen, 'movetime': movetime, 'depth': depth, 'nodes': nodes, 'id': request_id}
+        return self.request('POST', '/analyse', {key: value for key, value in request.items() if value is not None})
+
+    def stream(self, fen, movetime=None, depth=None, nodes=None, request_id=None):
+        """
+        Yields the message of every completed iteration, then the result.
+        """
+        request = {'fen': fen, 'movetime': movetime, 'depth': depth, 'nodes': nodes, 'id': request_id, 'stream': True}
+        connection = self.connection()
+        try:
+            connection.request('POST', '/analyse', json.dumps({key: value for key, value in request.items() if value is not None}),
+                               {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            if response.status != 200:
+                yield json.loads(response.read())
+                return
+            for line in response:  # http.client undoes the chunked encoding
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            connection.close()
+
+    def cancel(self, request_id):
+        return self.request('POST', f'/cancel/{request_id}')
+
+    def status(self):
+        return self.request('GET', '/status')
+
+def load_test(client, requests=100, concurrency=8, movetime=0.2, depth=None):
+    """
+    Sends the bench positions round robin from concurrency threads and prints throughput and latencies.
+    """
+    def one(index):
+        start_time = time.time()
+        status, result = client.analyse(bench_positions[index % len(bench_positions)], movetime, depth)
+        return status, result, time.time() - start_time
+
+    start_time = time.time()
+    latencies, errors, nodes = [], 0, 0
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+        for status, result, latency in executor.map(one, range(requests)):
+            if status != 200:
+                errors += 1
+                continue
+            latencies.append(latency)
+            nodes += result.get('nodes') or 0
+    elapsed = time.time() - start_time
+    latencies.sort()
+    print(f"Requests: {requests} ({errors} failed) in {elapsed:.2f}s, {len(latencies) / elapsed:.2f} requests/second")
+    print(f"Latency p50 {percentile(latencies, 50):.3f}s p90 {percentile(latencies, 90):.3f}s "
+          f"p99 {percentile(latencies, 99):.3f}s max {latencies[-1] if latencies else 0:.3f}s")
+    print(f"Nodes: {nodes}, {nodes / elapsed:.0f} nodes/second over all workers")
+
+def main():
+    parser = argparse.ArgumentParser(description="Query or load test the analysis server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8170)
+    parser.add_argument('--unix', help="Unix socket of the server instead of TCP")
+    commands = parser.add_subparsers(dest='command', required=True)
+    analyse = commands.add_parser('analyse', help="analyse one position")
+    analyse.add_argument('fen')
+    analyse.add_argument('--id', help="request id, to cancel it from elsewhere")
+    analyse.add_argument('--stream', action='store_true', help="print every iteration as it completes")
+    cancel = commands.add_parser('cancel', help="cancel a queued or running analysis")
+    cancel.add_argument('id')
+    commands.add_parser('status', help="show the queue and the busy workers")
+    load = commands.add_parser('load', help="load test with the bench positions")
+    load.add_argument('--requests', type=int, default=100)
+    load.add_argument('--concurrency', type=int, default=8)
+    for command in (analyse, load):
+        command.add_argument('--movetime', type=float, help="seconds per analysis")
+        command.add_argument('--depth', type=int, help="maximum search depth")
+    analyse.add_argument('--nodes', type=int, help="maximum nodes")
+    args = parser.parse_args()
+
+    client = AnalysisClient(args.host, args.port, args.unix)
+    if args.command == 'analyse' and args.stream:
+        for message in client.stream(args.fen, args.movetime, args.depth, args.nodes, args.id):
+            print(json.dumps(message))
+    elif args.command == 'analyse':
+        print(json.dumps(client.analyse(args.fen, args.movetime, args.depth, args.nodes, args.id)[1]))
+    elif args.command == 'cancel':
+        print(json.dumps(client.cancel(args.id)[1]))
+    elif args.command == 'status':
+        print(json.dumps(client.status()[1]))
+    else:
+        load_test(client, args.requests, args.concurrency, args.movetime or 0.2, args.depth)
+
+if __name__ == '__main__':
+    main()
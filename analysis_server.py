@@ -0,0 +1,341 @@
+"""
+Local analysis server: position analysis with the v3 engine over HTTP/JSON, on TCP or a Unix socket.
+
+    python analysis_server.py --port 8170 --workers 4
+    python analysis_server.py --unix /tmp/analysis.sock --hash 64
+
+    POST /analyse     {"fen": ..., "movetime": 2, "depth": 6, "nodes": 100000, "stream": true, "id": "optional"}
+    POST /cancel/<id> cancels a queued or running analysis, which then reports what it found so far
+    GET  /status      queue length and busy workers
+
+Requests are queued and handed to a pool of long-lived worker processes, each with its own transposition
+table and evaluation cache, kept warm from one request to the next. With --hash the workers share one
+transposition table in shared memory instead, so a position one worker has searched is cheap for all of them.
+A worker that dies is replaced and its request answered with an error. Every search is capped at the
+server's time budget whatever it asks for. Scores are in centipawns from White's point of view, with 'mate'
+the moves to mate (negative when Black mates) when the engine sees one.
+A streamed analysis answers with one JSON line per completed iteration (chunked transfer) and the result
+last; otherwise the result is the whole response.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import threading
+import time
+import chess
+from ttable import TranspositionTable
+
+default_movetime = 1.0  # Seconds, for requests without any limit
+max_movetime = 10.0  # Seconds, the budget no request can exceed
+max_queue = 256  # Queued requests beyond this are refused with 503
+worker_hash_mb = 16  # Tables of a worker without a shared --hash table
+worker_check_interval = 0.5  # Seconds between checks for dead workers
+
+# Worker processes
+
+# Request the worker process is searching for, and the lock that keeps a cancel from landing between two
+# requests: a cancel only stops the search of the request it names
+running_request = None
+running_lock = threading.Lock()
+
+def watch_cancel(cancels):
+    """
+    Thread of a worker process: stops the running search when the server cancels it.
+    """
+    import aiv3
+    while True:
+        request_id = cancels.get()
+        with running_lock:
+            if request_id == running_request:
+                aiv3.stop_requested = True
+
+def start_request(request_id):
+    global running_request
+    import aiv3
+    with running_lock:
+        running_request = request_id
+        aiv3.stop_requested = False
+
+def score_report(score, board, move, stats):
+    """
+    Score of the line starting with move, in centipawns from White's point of view, and the moves to mate.
+    """
+    import aiv3
+    if move is not None:
+        board.push(move)
+    try:
+        return {'score': aiv3.centipawns(score, board), 'mate': aiv3.mate_in(score, stats)}
+    finally:
+        if move is not None:
+            board.pop()
+
+def worker_main(tasks, results, cancels, table_name):
+    import aiv3
+    from timeman import TimeManager
+    from ttable import TranspositionTable, search_tables
+
+    aiv3.transposition_table, aiv3.eval_cache = search_tables(worker_hash_mb)
+    if table_name:
+        aiv3.transposition_table = TranspositionTable.attach(table_name)
+    threading.Thread(target=watch_cancel, args=(cancels,), daemon=True).start()
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        request_id, fen, depth, movetime, nodes, stream = task
+        start_request(request_id)
+        board = chess.Board(fen)
+        start_time = time.time()
+
+        def on_iteration(iteration_depth, score, move):
+            if stream:
+                results.put(('info', request_id, dict(
+                    score_report(score, board, move, aiv3.stats), depth=iteration_depth,
+                    seldepth=aiv3.stats.seldepth, move=move.uci() if move else None, nodes=aiv3.stats.nodes,
+                    time=time.time() - start_time)))
+
+        try:
+            if board.is_game_over():
+                results.put(('done', request_id, {'move': None, 'score': None, 'result': board.result()}))
+                continue
+            score, move, stats = aiv3.search(board, depth, TimeManager.from_movetime(movetime), on_iteration, nodes)
+            results.put(('done', request_id, dict(
+                score_report(score, board, move, stats), move=move.uci() if move else None,
+                san=board.san(move) if move else None, depth=stats.depth, seldepth=stats.seldepth,
+                nodes=stats.nodes, time=time.time() - start_time, cancelled=aiv3.stop_requested)))
+        except Exception as error:  # A bad request must not take the worker down
+            results.put(('error', request_id, {'error': str(error)}))
+        finally:
+            start_request(None)
+
+class Worker:
+    def __init__(self, context, results, table_name=None):
+        self.tasks = context.Queue()
+        self.cancels = context.Queue()  # Ids of requests to stop
+        self.process = context.Process(target=worker_main, args=(self.tasks, results, self.cancels, table_name),
+                                       daemon=True)
+        self.process.start()
+        self.request_id = None
+
+# Server
+
+class AnalysisServer:
+    def __init__(self, workers=None, budget=max_movetime, queue_size=max_queue, hash_mb=None):
+        self.budget = budget
+        self.table = TranspositionTable.create_shared(hash_mb) if hash_mb else None
+        self.context = multiprocessing.get_context()
+        self.results = self.context.Queue()
+        self.workers = [self.new_worker() for _ in range(workers or os.cpu_count())]
+        self.pending = asyncio.Queue(queue_size)
+        self.idle = asyncio.Queue()
+        for worker in self.workers:
+            self.idle.put_nowait(worker)
+        self.requests = {}  # id -> asyncio.Queue of ('info' | 'done' | 'error', data) messages
+        self.cancelled = set()
+        self.ids = itertools.count(1)
+        self.loop = None
+
+    def new_worker(self):
+        return Worker(self.context, self.results, self.table.name if self.table else None)
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        threading.Thread(target=self.read_results, daemon=True).start()
+        self.loop.create_task(self.dispatch())
+        self.loop.create_task(self.watch_workers())
+
+    async def watch_workers(self):
+        """
+        Replace workers that died, answering the request they were searching with an error.
+        """
+        while True:
+            await asyncio.sleep(worker_check_interval)
+            for index, worker in enumerate(self.workers):
+                if worker.process.exitcode is None:
+                    continue
+                replacement = self.new_worker()
+                self.workers[index] = replacement
+                request_id, worker.request_id = worker.request_id, None
+                if request_id is not None:
+                    messages = self.requests.get(request_id)
+                    if messages is not None:
+                        messages.put_nowait(('error', {'error': f"worker died with exit code {worker.process.exitcode}"}))
+                self.idle.put_nowait(replacement)
+
+    def read_results(self):
+        # Runs in a thread: the multiprocessing queue can only be read blocking
+        while True:
+            kind, request_id, data = self.results.get()
+            self.loop.call_soon_threadsafe(self.deliver, kind, request_id, data)
+
+    def deliver(self, kind, request_id, data):
+        messages = self.requests.get(request_id)
+        if messages is not None:
+            messages.put_nowait((kind, data))
+        if kind != 'info':
+            for worker in self.workers:
+                if worker.request_id == request_id:
+                    worker.request_id = None
+                    self.idle.put_nowait(worker)
+
+    async def dispatch(self):
+        while True:
+            task = await self.pending.get()
+            request_id = task[0]
+            if request_id in self.cancelled:
+                self.cancelled.discard(request_id)
+                self.deliver('done', request_id, {'move': None, 'cancelled': True})
+                continue
+            worker = await self.idle.get()
+            while worker not in self.workers:  # Died while idle, watch_workers() put a replacement in the queue
+                worker = await self.idle.get()
+            worker.request_id = request_id
+            worker.tasks.put(task)
+
+    def submit(self, request):
+        """
+        Queue an analysis. Returns (id, queue of messages) or raises asyncio.QueueFull.
+        """
+        board = chess.Board(request['fen'])  # Invalid FENs are refused before they reach a worker
+        if not board.is_valid():
+            raise ValueError(f"invalid position: {request['fen']}")
+        request_id = str(request.get('id') or next(self.ids))
+        if request_id in self.requests:
+            raise ValueError(f"analysis {request_id} is already running")
+        limits = [request.get(name) for name in ('movetime', 'depth', 'nodes')]
+        movetime = min(float(request.get('movetime') or (math.inf if any(limits) else default_movetime)), self.budget)
+        depth = int(request.get('depth') or 64)
+        nodes = int(request['nodes']) if request.get('nodes') else None
+        messages = asyncio.Queue()
+        self.pending.put_nowait((request_id, board.fen(), depth, movetime, nodes, bool(request.get('stream'))))
+        self.requests[request_id] = messages
+        return request_id, messages
+
+    def cancel(self, request_id):
+        if request_id not in self.requests:
+            return False
+        for worker in self.workers:
+            if worker.request_id == request_id:
+                worker.cancels.put(request_id)
+                return True
+        self.cancelled.add(request_id)  # Still queued, dropped by dispatch()
+        return True
+
+    def status(self):
+        return {
+            'workers': len(self.workers),
+            'busy': sum(1 for worker in self.workers if worker.request_id is not None),
+            'queued': self.pending.qsize(),
+            'budget': self.budget,
+            'hash': self.table.usage() if self.table else None,
+        }
+
+    # HTTP
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            if len(request_line) < 2:
+                return
+            method, path = request_line[0], request_line[1]
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+            await self.route(method, path, body, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body, writer):
+        if method == 'GET' and path == '/status':
+            await self.respond(writer, 200, self.status())
+        elif method == 'POST' and path.startswith('/cancel/'):
+            found = self.cancel(path[len('/cancel/'):])
+            await self.respond(writer, 200 if found else 404, {'cancelled': found})
+        elif method == 'POST' and path == '/analyse':
+            try:
+                request = json.loads(body or b'{}')
+                request_id, messages = self.submit(request)
+            except asyncio.QueueFull:
+                await self.respond(writer, 503, {'error': 'queue full'})
+                return
+            except (ValueError, KeyError, TypeError) as error:
+                await self.respond(writer, 400, {'error': str(error)})
+                return
+            answered = False
+            try:
+                await self.answer(request_id, messages, bool(request.get('stream')), writer)
+                answered = True
+            finally:
+                if not answered:  # Client went away, don't keep a worker busy for nobody
+                    self.cancel(request_id)
+                self.requests.pop(request_id, None)
+        else:
+            await self.respond(writer, 404, {'error': f"no route {method} {path}"})
+
+    async def answer(self, request_id, messages, stream, writer):
+        if stream:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                         b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+        while True:
+            kind, data = await messages.get()
+            data = dict(data, id=request_id)
+            if stream:
+                line = json.dumps(dict(data, type=kind)).encode() + b'\n'
+                writer.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                await writer.drain()
+            if kind == 'info':
+                continue
+            if stream:
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+            else:
+                await self.respond(writer, 500 if kind == 'error' else 200, data)
+            return
+
+    async def respond(self, writer, status, data):
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+        body = json.dumps(data).encode()
+        writer.write(f"HTTP/1.1 {status} {reasons[status]}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+
+async def serve(host='127.0.0.1', port=8170, unix_path=None, workers=None, budget=max_movetime, hash_mb=None):
+    server = AnalysisServer(workers, budget, hash_mb=hash_mb)
+    server.start()
+    if unix_path:
+        listener = await asyncio.start_unix_server(server.handle, unix_path)
+        print(f"Serving analysis on {unix_path} with {len(server.workers)} workers", flush=True)
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        print(f"Serving analysis on http://{host}:{port} with {len(server.workers)} workers", flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve v3 engine analysis over HTTP/JSON.")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on")
+    parser.add_argument('--port', type=int, default=8170, help="TCP port to listen on")
+    parser.add_argument('--unix', help="listen on this Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, help="number of worker processes (default: one per core)")
+    parser.add_argument('--budget', type=float, default=max_movetime, help="maximum seconds any one analysis may search")
+    parser.add_argument('--hash', type=int, help="MB of transposition table shared by the workers (default: none)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.budget, args.hash))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
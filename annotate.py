@@ -0,0 +1,207 @@
+"""
+Batch PGN analysis: every move of every game is annotated with the v3 engine's evaluation and best move, and
+inaccuracies, mistakes and blunders are flagged. Games are read one at a time and written out in order as soon
+as they are done, with only a few per worker in flight, so memory stays flat however big the input is.
+
+    python annotate.py games.pgn --output annotated.pgn --depth 3 --workers 8
+    python annotate.py games.pgn --output moves.jsonl --movetime 0.5   # One JSON line per move
+"""
+import argparse
+import collections
+import io
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+import chess
+import chess.pgn
+from telemetry import log, log_to
+
+# Loss in centipawns (from the side that moved) of the played move against the engine's best move
+inaccuracy, mistake, blunder = 50, 100, 300
+max_loss = 1000  # Losses are capped here, so walking into a mate or missing one counts as a blunder, not 10000
+nags = {'inaccuracy': chess.pgn.NAG_DUBIOUS_MOVE, 'mistake': chess.pgn.NAG_MISTAKE, 'blunder': chess.pgn.NAG_BLUNDER}
+
+def classify(loss):
+    if loss >= blunder:
+        return 'blunder'
+    if loss >= mistake:
+        return 'mistake'
+    if loss >= inaccuracy:
+        return 'inaccuracy'
+    return None
+
+def analyse_position(board, depth, movetime=None):
+    """
+    Returns (score from White's point of view, best move, search stats or None once the game is over).
+    """
+    import aiv3
+    from timeman import TimeManager
+
+    if board.is_game_over():
+        outcome = board.outcome()
+        score = 0 if outcome.winner is None else aiv3.MAX if outcome.winner == chess.WHITE else aiv3.MIN
+        return score, None, None
+    return aiv3.search(board, depth, TimeManager.from_movetime(movetime or math.inf))
+
+def iteration_result(board, score, move, stats, depth):
+    """
+    Score and best move of the position at depth, out of the iterations of the search that gave score and
+    move, so a position is never searched twice. Its deepest iteration if it didn't get that far.
+    """
+    import aiv3
+
+    if stats is None or not stats.iterations:  # Game over or a forced move, nothing deeper to pick from
+        return score, move
+    if depth < 1:
+        return aiv3.evaluate_board(board), None
+    iteration = next((iteration for iteration in stats.iterations if iteration['depth'] == depth), stats.iterations[-1])
+    return iteration['score'], chess.Move.from_uci(iteration['move']) if iteration['move'] else None
+
+def line_centipawns(score, board, move):
+    """
+    Score of the line starting with move (None once the game is over), in centipawns from White's point of
+    view.
+    """
+    import aiv3
+
+    if move is None:
+        return aiv3.centipawns(score, board)
+    board.push(move)
+    try:
+        return aiv3.centipawns(score, board)
+    finally:
+        board.pop()
+
+def eval_comment(score, move, stats, board):
+    """
+    The PGN %eval of a position: pawns, or #N when the engine sees a mate in N moves (negative when Black mates).
+    """
+    import aiv3
+
+    if board.is_checkmate():
+        return "[%eval #0]"
+    mate = aiv3.mate_in(score, stats) if stats is not None else None
+    if mate is not None:
+        return f"[%eval #{mate}]"
+    return f"[%eval {line_centipawns(score, board, move) / 100:.2f}]"
+
+def annotate_game(task):
+    """
+    Worker: task is (game index, PGN text, depth, movetime). Returns (game index, annotated PGN, move records).
+
+    The loss of a move compares the best line found at the parent with the played move's position at one ply
+    less deep (an iteration of its own search), so both are scores of lines of the same length: the full
+    search of the next position is one ply deeper, and the horizon alone would swing it by a tempo's worth
+    of material.
+    """
+    game_index, pgn, depth, movetime = task
+    game = chess.pgn.read_game(io.StringIO(pgn))
+    board = game.board()
+    score, best_move, stats = analyse_position(board, depth, movetime)
+    records = []
+    node = game
+    while node.variations:
+        node = node.variation(0)
+        move = node.move
+        mover = board.turn
+        san = board.san(move)
+        best_san = board.san(best_move) if best_move else None
+        best_cp = line_centipawns(score, board, best_move)
+        board.push(move)
+        next_score, next_best, next_stats = analyse_position(board, depth, movetime)
+
+        loss = 0
+        if best_move is not None and move != best_move:
+            played_depth = max(0, (stats.depth if stats is not None else depth) - 1)
+            played_score, played_best = iteration_result(board, next_score, next_best, next_stats, played_depth)
+            played_cp = line_centipawns(played_score, board, played_best)
+            sign = 1 if mover == chess.WHITE else -1
+            loss = min(max_loss, max(0, (best_cp - played_cp) * sign))
+        judgement = classify(loss)
+        if judgement:
+            node.nags.add(nags[judgement])
+        comment = eval_comment(next_score, next_best, next_stats, board)
+        if move != best_move and best_san:
+            comment += f" best {best_san}"
+        node.comment = f"{node.comment} {comment}".strip() if node.comment else comment
+        records.append({
+            'game': game_index,
+            'ply': board.ply(),
+            'move': san,
+            'best': best_san,
+            'score': line_centipawns(next_score, board, next_best),
+            'loss': loss,
+            'judgement': judgement,
+        })
+        score, best_move, stats = next_score, next_best, next_stats
+    return game_index, str(game), records
+
+def read_games(f):
+    """
+    Yields the PGN text of every game, without keeping more than one game in memory.
+    """
+    while True:
+        game = chess.pgn.read_game(f)
+        if game is None:
+            return
+        yield str(game)
+
+def run(input_filename, output_filename=None, depth=3, movetime=None, workers=None, output_format=None):
+    workers = workers or os.cpu_count()
+    output_format = output_format or ('jsonl' if output_filename and output_filename.endswith('.jsonl') else 'pgn')
+    output = open(output_filename, 'w') if output_filename else sys.stdout
+    if output is sys.stdout:
+        log_to(sys.stderr)  # Progress mustn't end up in the annotated games
+    start_time = time.time()
+    games = moves = 0
+    judgements = collections.Counter()
+
+    def write(result):
+        nonlocal games, moves
+        _, pgn, records = result
+        if output_format == 'jsonl':
+            for record in records:
+                output.write(json.dumps(record) + '\n')
+        else:
+            output.write(pgn + '\n\n')
+        output.flush()
+        games += 1
+        moves += len(records)
+        judgements.update(record['judgement'] for record in records if record['judgement'])
+        log.info(f"Game {games}: {len(records)} moves, {games / (time.time() - start_time):.2f} games/second")
+
+    # A bounded window of games in flight, written in input order
+    in_flight = collections.deque()
+    with open(input_filename) as f, multiprocessing.Pool(workers) as pool:
+        for game_index, pgn in enumerate(read_games(f)):
+            in_flight.append(pool.apply_async(annotate_game, ((game_index, pgn, depth, movetime),)))
+            while len(in_flight) >= 2 * workers or in_flight and in_flight[0].ready():
+                write(in_flight.popleft().get())
+        while in_flight:
+            write(in_flight.popleft().get())
+    if output is not sys.stdout:
+        output.close()
+
+    elapsed = time.time() - start_time
+    log.info(f"Annotated {games} games, {moves} moves in {elapsed:.1f}s "
+             f"({moves / elapsed if elapsed else 0:.1f} moves/second)")
+    log.info(f"Inaccuracies: {judgements['inaccuracy']}, mistakes: {judgements['mistake']}, "
+             f"blunders: {judgements['blunder']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Annotate every move of a PGN file with the v3 engine.")
+    parser.add_argument('pgn', help="games to annotate")
+    parser.add_argument('--output', help="annotated PGN, or JSON lines if it ends in .jsonl (default: PGN on stdout)")
+    parser.add_argument('--format', choices=['pgn', 'jsonl'], help="output format (default: from the output file name)")
+    parser.add_argument('--depth', type=int, default=3, help="search depth per position")
+    parser.add_argument('--movetime', type=float, help="seconds per position, searching up to --depth")
+    parser.add_argument('--workers', type=int, help="number of worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    run(args.pgn, args.output, args.depth, args.movetime, args.workers, args.format)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Drive many harness games from one asyncio event loop. Stockfish runs through python-chess's chess.engine
+(popen_uci) and our engines are wrapped behind the same play() protocol, searching in worker processes. A
+game keeps one worker process from its first move to its last, so the players' per-game state (opening
+book, search tables) only ever sees that game.
+
+    python async_match.py v3 --games 200 --concurrency 24
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import copy
+import time
+import chess
+import chess.engine
+from adjudication import add_adjudication_arguments, adjudicator_from_args
+from harness import MatchStats, stockfish_player
+from headless import harnesses
+from opponents import stockfish_settings
+from timecontrol import ChessClock, TimeControl, flag_result
+
+stockfish_depth = 15  # Same default depth as the stockfish package
+
+def stockfish_opponent(harness):
+    """
+    (path, UCI options) of the harness's Stockfish opponent, as the synchronous harness sets them, or None
+    when the opponent is one of our engines.
+    """
+    opponent = harnesses[harness]['opponent']
+    if getattr(opponent, 'func', None) is not stockfish_player:
+        return None
+    keywords = dict(opponent.keywords)
+    path = keywords.pop('path', 'stockfish')
+    return path, stockfish_settings(**keywords)
+
+# Players built by this worker process, keyed by (harness, role). A worker plays one game at a time.
+worker_players = {}
+
+def local_player(harness, role):
+    if (harness, role) not in worker_players:
+        worker_players[harness, role] = harnesses[harness][role]()
+    return worker_players[harness, role]
+
+def local_new_game(harness, roles):
+    for role in roles:
+        player = local_player(harness, role)
+        if hasattr(player, 'new_game'):
+            player.new_game()
+
+def local_move(harness, role, board, limits=None):
+    return local_player(harness, role)(board, limits)
+
+class LocalEngine:
+    """
+    One of our engines exposed with the play() coroutine of chess.engine.Protocol, for one game. The search
+    runs in the executor of the game's worker process so the event loop keeps serving other games.
+    """
+    def __init__(self, harness, role, executor):
+        self.harness = harness
+        self.role = role
+        self.executor = executor
+
+    async def play(self, board, limit=None, *, game=None, info=chess.engine.INFO_NONE):
+        limits = None
+        if limit is not None and limit.white_clock is not None:
+            limits = {'wtime': limit.white_clock, 'btime': limit.black_clock, 'winc': limit.white_inc or 0,
+                      'binc': limit.black_inc or 0, 'movestogo': limit.remaining_moves}
+        loop = asyncio.get_running_loop()
+        move, move_info = await loop.run_in_executor(self.executor, local_move, self.harness, self.role, board.copy(), limits)
+        if move is None:
+            move, move_info = next(iter(board.legal_moves)), {'phase': 'random'}
+        if move_info.get('score') is not None:
+            move_info['score'] = chess.engine.PovScore(chess.engine.Cp(move_info['score']), chess.WHITE)
+        return chess.engine.PlayResult(move, None, move_info)
+
+    async def quit(self):
+        pass
+
+async def open_stockfish(path, settings):
+    _, engine = await chess.engine.popen_uci(path)
+    # chess.engine refuses options the engine doesn't have and those it manages itself (Ponder, MultiPV, ...)
+    await engine.configure({name: value for name, value in settings.items()
+                            if name in engine.options and not engine.options[name].is_managed()})
+    return engine
+
+async def play_game(white, black, game_id, moves, adjudicator=None, time_control=None):
+    """
+    Same as harness.play_game, with every move's info appended to moves.
+    """
+    board = chess.Board()
+    players = {chess.WHITE: white, chess.BLACK: black}
+    clock = ChessClock(time_control) if time_control else None
+    while not board.is_game_over():
+        if clock:
+            limits = clock.limits(board.turn)
+            limit = chess.engine.Limit(white_clock=limits['wtime'], black_clock=limits['btime'], white_inc=limits['winc'],
+                                       black_inc=limits['binc'], remaining_moves=limits['movestogo'])
+        else:
+            limit = chess.engine.Limit(depth=stockfish_depth)
+        start_time = time.time()
+        result = await players[board.turn].play(board, limit, game=game_id, info=chess.engine.INFO_BASIC | chess.engine.INFO_SCORE)
+        elapsed_time = time.time() - start_time
+        score = result.info.get('score')
+        score = score.white().score(mate_score=100000) if score else None
+        if clock and not clock.punch(board.turn, elapsed_time):
+            return flag_result(board, board.turn)  # The move came too late and is not recorded
+        moves.append({'color': 'white' if board.turn == chess.WHITE else 'black', 'move': result.move.uci(),
+                      'time': elapsed_time, 'phase': result.info.get('phase', 'search'), 'score': score,
+                      'nodes': result.info.get('nodes', 0), 'depth': result.info.get('depth')})
+        board.push(result.move)
+        if adjudicator:
+            adjudicated = adjudicator.adjudicate(board, score)
+            if adjudicated:
+                return adjudicated
+    return board.result()
+
+async def run(harness, max_games=10, concurrency=8, workers=None, stockfish_path=None, alternate=False,
+              adjudicator=None, time_control=None):
+    """
+    concurrency games are in flight, each holding one of the worker processes (default: one per game) for
+    all of its moves. stockfish_path overrides the path of the harness's Stockfish opponent.
+    """
+    config = harnesses[harness]
+    stats = MatchStats()
+    stockfish = stockfish_opponent(harness)
+    local_opponent = stockfish is None
+    executors = [concurrent.futures.ProcessPoolExecutor(1) for _ in range(workers or concurrency)]
+    idle_executors = asyncio.Queue()
+    for executor in executors:
+        idle_executors.put_nowait(executor)
+
+    # One opponent per game in flight: a UCI engine only thinks about one position at a time
+    opponents = asyncio.Queue()
+    if not local_opponent:
+        for _ in range(concurrency):
+            opponents.put_nowait(await open_stockfish(stockfish_path or stockfish[0], stockfish[1]))
+    games = asyncio.Semaphore(concurrency)
+
+    async def play_one(game_index):
+        ai_color = config['ai_color'] if not alternate or game_index % 2 == 0 else not config['ai_color']
+        async with games:
+            executor = await idle_executors.get()
+            opponent = LocalEngine(harness, 'opponent', executor) if local_opponent else await opponents.get()
+            try:
+                roles = ['engine', 'opponent'] if local_opponent else ['engine']
+                await asyncio.get_running_loop().run_in_executor(executor, local_new_game, harness, roles)
+                engine = LocalEngine(harness, 'engine', executor)
+                white, black = (engine, opponent) if ai_color == chess.WHITE else (opponent, engine)
+                moves = []
+                game_adjudicator = copy.copy(adjudicator) if adjudicator else None  # Every game in flight has its own counters
+                if game_adjudicator:
+                    game_adjudicator.reset()
+                result = await play_game(white, black, object(), moves, game_adjudicator, time_control)
+            finally:
+                if not local_opponent:
+                    opponents.put_nowait(opponent)
+                idle_executors.put_nowait(executor)
+        stats.record(result, ai_color)
+        stats.add_moves(moves, ai_color)
+        print(f"Game {game_index + 1} ({'White' if ai_color == chess.WHITE else 'Black'}): {result}  "
+              f"[+{stats.wins} -{stats.losses} ={stats.draws}]", flush=True)
+
+    try:
+        await asyncio.gather(*(play_one(game_index) for game_index in range(max_games)))
+    finally:
+        while not opponents.empty():
+            await opponents.get_nowait().quit()
+        for executor in executors:
+            executor.shutdown()
+    stats.print_summary()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a harness match from one asyncio event loop.")
+    parser.add_argument('harness', choices=sorted(harnesses))
+    parser.add_argument('--games', type=int, default=10, help="number of games to play")
+    parser.add_argument('--concurrency', type=int, default=8, help="number of games in flight")
+    parser.add_argument('--workers', type=int, help="processes searching for our engines, one per game in flight (default: --concurrency)")
+    parser.add_argument('--stockfish', help="path of the UCI opponent (default: the harness's)")
+    parser.add_argument('--alternate', action='store_true', help="swap colours every game")
+    parser.add_argument('--tc', type=TimeControl.parse, help="time control [moves/]base[+increment] in seconds, e.g. 60+0.6")
+    add_adjudication_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.harness, args.games, args.concurrency, args.workers, args.stockfish, args.alternate,
+                    adjudicator_from_args(args), args.tc))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+import json
+import os
+import chess
+import chess.polyglot
+
+# Directory containing the Polyglot books
+polyglot_directory = 'polyglot-collection'
+polyglot_filenames = [
+    'Perfect2023.bin', 'Titans.bin', 'Book.bin', 'book2.bin', 'codekiddy.bin', 'baron30.bin',
+    'DCbook_large.bin', 'Elo2400.bin', 'final-book.bin', 'gm2001.bin',
+    'gm2600.bin', 'human.bin', 'komodo.bin', 'KomodoVariety.bin', 'Performance.bin', 'varied.bin'
+]
+polyglot_books = [os.path.join(polyglot_directory, filename) for filename in polyglot_filenames]
+
+# Max depth (in plies) of every book, written by compile_book_depths()
+book_depths_filename = os.path.join(polyglot_directory, 'book-depths.json')
+
+max_misses = 2  # Consecutive misses before we stop probing for the rest of the game
+
+def book_depth(book_filename):
+    """
+    Walk every line of a book from the starting position and return the highest ply that still has a book move.
+    A transposition is expanded again whenever it is reached at a higher ply than before, so the result doesn't
+    depend on the order the lines are walked in. Lines that repeat a position of their own are not followed
+    around the cycle.
+    """
+    board = chess.Board()
+    deepest_ply = {}  # Zobrist key -> highest ply the position has been expanded at
+    path = []  # Keys of the positions on the current line
+    deepest = 0
+    with chess.polyglot.open_reader(book_filename) as reader:
+        stack = [iter(reader.find_all(board))]
+        while stack:
+            entry = next(stack[-1], None)
+            if entry is None:
+                stack.pop()
+                if board.move_stack:
+                    board.pop()
+                    path.pop()
+                continue
+            board.push(entry.move)
+            key = chess.polyglot.zobrist_hash(board)
+            entries = []
+            if key not in path and deepest_ply.get(key, -1) < board.ply():
+                deepest_ply[key] = board.ply()
+                entries = list(reader.find_all(board))
+            if entries:
+                deepest = max(deepest, board.ply())
+            path.append(key)
+            stack.append(iter(entries))
+    return deepest
+
+def compile_book_depths(book_filenames=None, filename=book_depths_filename):
+    """
+    Compute the max depth of each book and save it, keyed by file name and size so stale entries are ignored.
+    """
+    depths = {}
+    for book_filename in book_filenames or polyglot_books:
+        if not os.path.exists(book_filename):
+            continue
+        depths[os.path.basename(book_filename)] = {
+            'size': os.path.getsize(book_filename),
+            'max_ply': book_depth(book_filename),
+        }
+        print(f"{book_filename}: {depths[os.path.basename(book_filename)]['max_ply']} plies")
+    with open(filename, 'w') as f:
+        json.dump(depths, f, indent=2, sort_keys=True)
+    return depths
+
+def load_book_depths(filename=book_depths_filename):
+    try:
+        with open(filename) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+class OpeningBook:
+    """
+    Probes a list of Polyglot books in order and keeps track of whether the current game is still in book.
+    Once the game has left book (max_misses consecutive misses, or a ply deeper than any book goes) the books
+    are not touched again until reset() is called, which whoever plays the games does before every new game.
+    One book follows one game at a time; games played side by side need a book each.
+    """
+    def __init__(self, book_filenames=None, max_misses=max_misses):
+        self.book_filenames = list(book_filenames or polyglot_books)  # Missing books are dropped by open()
+        self.max_misses = max_misses
+        self.readers = None
+        self.max_ply = None
+        self.probes = 0
+        self.skipped = 0
+        self.reset()
+
+    def open(self):
+        # Books are opened once and kept memory mapped instead of being reopened on every probe
+        self.book_filenames = [f for f in self.book_filenames if os.path.exists(f)]
+        self.readers = [chess.polyglot.open_reader(f) for f in self.book_filenames]
+        depths = load_book_depths()
+        max_plies = []
+        for book_filename in self.book_filenames:
+            depth = depths.get(os.path.basename(book_filename))
+            if depth is None or depth['size'] != os.path.getsize(book_filename):
+                max_plies = None  # Depth unknown for this book, rely on the miss counter only
+                break
+            max_plies.append(depth['max_ply'])
+        self.max_ply = max(max_plies) if max_plies else None
+
+    def close(self):
+        for reader in self.readers or []:
+            reader.close()
+        self.readers = None
+
+    def reset(self):
+        """
+        Start a new game: probe the books again.
+        """
+        self.misses = 0
+        self.in_book = True
+
+    def probe(self, board):
+        if not self.in_book:
+            self.skipped += 1
+            return None
+        if self.readers is None:
+            self.open()
+        if self.max_ply is not None and board.ply() > self.max_ply:
+            self.in_book = False
+            return None
+
+        self.probes += 1
+        for reader in self.readers:
+            try:
+                entry = reader.find(board)
+                self.misses = 0
+                return entry.move
+            except (KeyError, IndexError):
+                continue
+
+        self.misses += 1
+        if self.misses >= self.max_misses:
+            self.in_book = False
+        return None
+
+default_book = OpeningBook()  # Of the GUI games (v3.py, v3eval.py), reset by new_game()
+
+def get_book_move(board):
+    return default_book.probe(board)
+
+def new_game():
+    default_book.reset()
+
+if __name__ == '__main__':
+    compile_book_depths()
@@ -0,0 +1,37 @@
+"""
+Registry of the engines that can play in matches and tournaments, by name. Each entry is a factory
+returning a player (see harness.play_game); it is only called in the process that plays the games.
+
+    python engines.py   # List the registered engines
+"""
+import functools
+from harness import aiv1_player, aiv2_player, aiv3_player, stockfish_player
+
+engines = {
+    'aiv1': functools.partial(aiv1_player, max_depth=3),
+    'aiv2': functools.partial(aiv2_player, max_depth=4, ordered=True),
+    'aiv3': functools.partial(aiv3_player, max_depth=4),
+    'aiv3-nobook': functools.partial(aiv3_player, max_depth=4, use_book=False),
+    'aiv3-warm': functools.partial(aiv3_player, max_depth=4, hash_mb=16, keep_hash=True),
+}
+for skill_level in (0, 4, 8, 12, 20):
+    engines[f'stockfish{skill_level}'] = functools.partial(stockfish_player, skill_level=skill_level)
+
+def register(name, factory):
+    engines[name] = factory
+
+def get_engine(name):
+    """
+    Player of a registered engine, e.g. get_engine('stockfish4').
+    """
+    if name not in engines:
+        raise KeyError(f"Unknown engine {name!r}, registered engines: {', '.join(sorted(engines))}")
+    return engines[name]()
+
+def main():
+    for name, factory in engines.items():
+        arguments = ', '.join(f"{key}={value}" for key, value in factory.keywords.items())
+        print(f"{name:<14} {factory.func.__name__}({arguments})")
+
+if __name__ == '__main__':
+    main()
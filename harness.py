@@ -0,0 +1,217 @@
+import logging
+import random
+import time
+import chess
+from latency import bucket_index, latency_buckets, print_histogram, print_latency_report
+from profiling import profiled
+from telemetry import counters, event, log, move_summary, new_game_id
+from timecontrol import ChessClock, flag_result
+
+# Elo calculation parameters
+initial_elo = 1200
+opponent_elo = 1200  # Assuming Stockfish has a very high rating
+K = 32  # K-factor in Elo rating system
+
+def update_elo(elo, actual_score, opponent_elo=opponent_elo, k=K):
+    expected_score = 1 / (1 + 10 ** ((opponent_elo - elo) / 400))
+    elo += k * (actual_score - expected_score)
+    return int(elo)  # Convert Elo to integer
+
+def play_game(white, black, board=None, verbose=False, adjudicator=None, moves=None, time_control=None):
+    """
+    Play one game between two players and return the result string ('1-0', '0-1' or '1/2-1/2').
+    A player is a function taking the board and the clock limits (None without a time control, see
+    timecontrol.ChessClock) and returning (move, info). info is a dict with the 'phase' the move came from
+    ('book', 'search' or 'random') and the 'score' in centipawns from White's point of view when the
+    player has one; players whose engine evaluates on another scale convert it, so adjudication thresholds
+    mean the same for every engine.
+    A player with per-game state (an opening book, search tables) has a new_game() attribute, called before
+    the first move; a player follows one game at a time.
+    Every move's info, with its colour, uci and time added, is appended to moves.
+    Moves are logged at INFO level with verbose, DEBUG otherwise, and sent to the event stream.
+    """
+    board = board or chess.Board()
+    players = {chess.WHITE: white, chess.BLACK: black}
+    for player in {white, black}:
+        if hasattr(player, 'new_game'):
+            player.new_game()
+    clock = ChessClock(time_control) if time_control else None
+    move_level = logging.INFO if verbose else logging.DEBUG
+    game_id = new_game_id()
+    event('game_start', game=game_id, fen=board.fen(), time_control=str(time_control) if time_control else None)
+    if adjudicator:
+        adjudicator.reset()
+    while not board.is_game_over():
+        start_time = time.time()
+        move, info = players[board.turn](board, clock.limits(board.turn) if clock else None)
+        if move is None:
+            move, info = random.choice(list(board.legal_moves)), {'phase': 'random'}
+        elapsed_time = time.time() - start_time
+        side = "White" if board.turn == chess.WHITE else "Black"
+        if clock and not clock.punch(board.turn, elapsed_time):
+            # The flag fell before the move was made: it is not recorded, so moves matches the board
+            result = flag_result(board, board.turn)
+            log.log(move_level, f"{side} lost on time")
+            return end_game(game_id, result, 'time forfeit')
+        if moves is not None:
+            moves.append(dict(info, color=side.lower(), move=move.uci(), time=elapsed_time))
+        event('move', game=game_id, ply=board.ply(), color=side.lower(), move=move.uci(), time=elapsed_time, **info)
+        log.log(move_level, move_summary(side, move, info, elapsed_time))
+        board.push(move)
+        if adjudicator:
+            result = adjudicator.adjudicate(board, info.get('score'))
+            if result:
+                log.log(move_level, f"Adjudicated {result}")
+                return end_game(game_id, result, 'adjudication')
+    return end_game(game_id, board.result(), 'game over')
+
+def end_game(game_id, result, reason):
+    event('game_end', game=game_id, result=result, reason=reason)
+    return result
+
+def score_for(result, color):
+    if result == '1-0':
+        return 1 if color == chess.WHITE else 0
+    if result == '0-1':
+        return 1 if color == chess.BLACK else 0
+    return 0.5
+
+class MatchStats:
+    """
+    Running totals of a match from the point of view of our engine. With keep_moves the per-move info is
+    kept for the latency percentiles, otherwise only sums and a latency histogram are.
+    """
+    def __init__(self, opponent_elo=opponent_elo, keep_moves=True):
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+        self.games_played = 0
+        self.elo = initial_elo
+        self.opponent_elo = opponent_elo
+        self.keep_moves = keep_moves
+        self.move_count = 0
+        self.total_move_time = 0.0
+        self.latency_counts = [0] * (len(latency_buckets) + 1)
+        self.moves = []  # Per-move info of our engine's moves, with keep_moves
+
+    def add_moves(self, moves, ai_color):
+        """
+        Keep our engine's moves out of the per-move dicts recorded by play_game.
+        """
+        color = 'white' if ai_color == chess.WHITE else 'black'
+        for move in moves:
+            if move['color'] != color:
+                continue
+            self.move_count += 1
+            self.total_move_time += move['time']
+            self.latency_counts[bucket_index(move['time'])] += 1
+            if self.keep_moves:
+                self.moves.append(move)
+
+    def record(self, result, ai_color):
+        actual_score = score_for(result, ai_color)
+        self.games_played += 1
+        if actual_score == 1:
+            self.wins += 1
+        elif actual_score == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+        self.elo = update_elo(self.elo, actual_score, self.opponent_elo)
+        return actual_score
+
+    def print_summary(self):
+        print(f"Games played: {self.games_played}")
+        print(f"AI Wins: {self.wins}")
+        print(f"AI Losses: {self.losses}")
+        print(f"Draws: {self.draws}")
+        print(f"Estimated Elo rating: {self.elo}")
+
+        if self.move_count:
+            average_move_time = self.total_move_time / self.move_count
+            print(f"Average move time: {average_move_time} seconds")
+        else:
+            print("No move times recorded.")
+        if self.keep_moves:
+            print_latency_report(self.moves)
+        elif self.move_count:
+            print_histogram(list(zip(list(latency_buckets) + [None], self.latency_counts)))
+
+# Players
+
+def aiv1_player(max_depth=3):
+    import aiv1
+
+    def play(board, limits=None):
+        if board.turn == chess.WHITE:
+            res = aiv1.Max(board, 0, -9999, 9999, max_depth)
+        else:
+            res = aiv1.Min(board, 0, -9999, 9999, max_depth)
+        return res[1], {'phase': 'search', 'score': res[0] * 100}  # aiv1 evaluates in pawns
+    return profiled(play)
+
+def aiv2_player(max_depth=4, ordered=False):
+    import aiv2
+
+    def play(board, limits=None):
+        score, move = aiv2.minimax(max_depth, board.turn == chess.WHITE, aiv2.MIN, aiv2.MAX, board, ordered)
+        return move, {'phase': 'search', 'score': score}
+    return profiled(play)
+
+def aiv3_player(max_depth=4, use_book=True, clock_depth=64, hash_mb=None, keep_hash=False, hash_file=None):
+    """
+    Searches max_depth plies, or under a clock as deep as the time manager allows (up to clock_depth).
+    With hash_mb the search gets a transposition table and evaluation cache, cleared every game unless
+    keep_hash is set. hash_file keeps them in a memory-mapped file, warm from one run to the next.
+    """
+    import aiv3
+    from book import OpeningBook
+    from timeman import TimeManager
+    from ttable import search_tables
+
+    book = OpeningBook() if use_book else None
+    tables = search_tables(hash_mb or 16, hash_file, aiv3.evaluation_hash()) if hash_mb or hash_file else (None, None)
+    keep_hash = keep_hash or hash_file is not None
+
+    def new_game():
+        if book:
+            book.reset()
+        if tables[0] is not None and not keep_hash:
+            for table in tables:
+                table.clear()
+
+    def play(board, limits=None):
+        # The tables of this player, other players of this process may have their own or none
+        aiv3.transposition_table, aiv3.eval_cache = tables
+        book_move = book.probe(board) if book else None
+        if book_move:
+            return book_move, {'phase': 'book'}
+        phase = 'tablebase' if aiv3.probe_tablebase(board) is not None else 'search'
+        if limits:
+            time_manager = TimeManager.from_limits(limits, board)
+            score, move, stats = aiv3.search(board, clock_depth, time_manager)
+        else:
+            score, move, stats = aiv3.search(board, max_depth)
+        counters['tablebase_hits'] += stats.tb_hits
+        board.push(move)  # The score is of the line starting with the move
+        score = aiv3.centipawns(score, board)
+        board.pop()
+        return move, {'phase': phase, 'score': score, 'nodes': stats.nodes, 'depth': stats.depth,
+                      'seldepth': stats.seldepth, 'tb_hits': stats.tb_hits}
+    player = profiled(play)
+    player.new_game = new_game
+    return player
+
+def stockfish_player(skill_level=0, path='stockfish', elo=None, **options):
+    """
+    options are further UCI options by name, see opponents.get_opponent().
+    """
+    from opponents import get_opponent
+
+    # One Stockfish process per worker, reused across games
+    stockfish = get_opponent(path, skill_level=skill_level, elo=elo, **options)
+
+    def play(board, limits=None):
+        move, info = stockfish.search(board, limits)
+        return move, dict(info, phase='search')
+    return play
@@ -0,0 +1,97 @@
+"""
+Headless versions of the evaluation harnesses (v1eval.py, v2eval.py, v3eval.py and v1v2.py).
+Nothing is drawn and there is no frame cap, so a match runs as fast as the engines can move.
+
+    python headless.py v3 --games 10
+"""
+import argparse
+import functools
+import chess
+from adjudication import add_adjudication_arguments, adjudicator_from_args
+from harness import MatchStats, play_game, aiv1_player, aiv2_player, aiv3_player, stockfish_player
+from results import config_hash, game_record, open_store
+from telemetry import open_events
+from timecontrol import TimeControl
+
+# Engine, opponent and default colour of our engine for each harness
+harnesses = {
+    'v1': dict(engine=functools.partial(aiv1_player, max_depth=3), opponent=functools.partial(stockfish_player, skill_level=0), ai_color=chess.WHITE),
+    'v2': dict(engine=functools.partial(aiv2_player, max_depth=4, ordered=True), opponent=functools.partial(stockfish_player, skill_level=0), ai_color=chess.BLACK),
+    'v3': dict(engine=functools.partial(aiv3_player, max_depth=4), opponent=functools.partial(stockfish_player, skill_level=4), ai_color=chess.BLACK),
+    'v3-warm': dict(engine=functools.partial(aiv3_player, max_depth=4, hash_mb=16, keep_hash=True), opponent=functools.partial(stockfish_player, skill_level=4), ai_color=chess.BLACK),
+    'v1v2': dict(engine=functools.partial(aiv1_player, max_depth=4), opponent=functools.partial(aiv2_player, max_depth=4), ai_color=chess.WHITE),
+}
+
+def run(harness, max_games=10, ai_color=None, verbose=False, adjudicator=None, results=None, resume=False,
+        time_control=None):
+    """
+    Finished games are saved to the results store if there is one; with resume the games already in it for
+    the same configuration count towards the totals and are not played again.
+    """
+    config = harnesses[harness]
+    engine = config['engine']()
+    opponent = config['opponent']()
+    ai_color = config['ai_color'] if ai_color is None else ai_color
+    ai_name, opponent_name = ("AI 1", "AI 2") if harness == 'v1v2' else ("AI", "Stockfish")
+    stats = MatchStats()
+
+    store = open_store(results) if results else None
+    config_id = config_hash(harness, config, ai_color, adjudicator, str(time_control) if time_control else None)
+    if store and resume:
+        for game in store.games(config_id):
+            stats.record(game['result'], ai_color)
+            stats.add_moves(game['moves'], ai_color)
+        if stats.games_played:
+            print(f"Resuming after {stats.games_played} games [+{stats.wins} -{stats.losses} ={stats.draws}]")
+
+    while stats.games_played < max_games:
+        white, black = (engine, opponent) if ai_color == chess.WHITE else (opponent, engine)
+        board = chess.Board()
+        moves = []
+        result = play_game(white, black, board, verbose=verbose, adjudicator=adjudicator, moves=moves,
+                           time_control=time_control)
+        stats.add_moves(moves, ai_color)
+        if store:
+            store.add(game_record(config_id, stats.games_played, ai_color, None, board, result, moves))
+        actual_score = stats.record(result, ai_color)
+        if actual_score == 0.5:
+            print("The game was a draw")
+        else:
+            winner = ai_name if actual_score == 1 else opponent_name
+            print(f"{winner} ({'White' if result == '1-0' else 'Black'}) won")
+        if harness != 'v1v2':
+            print(f"Current Elo after game {stats.games_played}: {stats.elo}")
+
+    if harness == 'v1v2':
+        print(f"Games played: {stats.games_played}")
+        print(f"AI 1 Wins: {stats.wins}")
+        print(f"AI 2 Wins: {stats.losses}")
+        print(f"Draws: {stats.draws}")
+    else:
+        stats.print_summary()
+    if store:
+        store.close()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an evaluation harness without a window or frame cap.")
+    parser.add_argument('harness', choices=sorted(harnesses))
+    parser.add_argument('--games', type=int, default=10, help="number of games to play")
+    parser.add_argument('--ai-color', choices=['white', 'black'], help="colour of our engine (default: as in the harness)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="print every move")
+    parser.add_argument('--tc', type=TimeControl.parse, help="time control [moves/]base[+increment] in seconds, e.g. 60+0.6")
+    parser.add_argument('--results', help="results store (.jsonl, or .db for SQLite) every finished game is saved to")
+    parser.add_argument('--resume', action='store_true', help="count the games already in the results store instead of replaying them")
+    parser.add_argument('--events', help="JSON lines file every move and game is appended to")
+    add_adjudication_arguments(parser)
+    args = parser.parse_args()
+
+    if args.events:
+        open_events(args.events)
+
+    ai_color = None if args.ai_color is None else args.ai_color == 'white'
+    run(args.harness, args.games, ai_color, args.verbose, adjudicator_from_args(args), args.results, args.resume,
+        args.tc)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Per-move latency percentiles and nodes per second, broken down by where the move came from
+(book, search, tablebase or random fallback).
+"""
+import math
+
+phases = ('book', 'tablebase', 'search', 'random')
+latency_buckets = (0.01, 0.1, 0.5, 1, 2, 5, 10, 30)  # Upper bounds in seconds
+
+def percentile(sorted_values, p):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def latency_by_phase(moves):
+    """
+    moves are the per-move dicts recorded by harness.play_game. Returns {phase: summary dict}.
+    """
+    by_phase = {}
+    for move in moves:
+        by_phase.setdefault(move.get('phase', 'search'), []).append(move)
+    summaries = {}
+    for phase, phase_moves in by_phase.items():
+        times = sorted(move['time'] for move in phase_moves)
+        nodes = sum(move.get('nodes', 0) for move in phase_moves)
+        depths = [move['depth'] for move in phase_moves if move.get('depth') is not None]
+        summaries[phase] = {
+            'moves': len(phase_moves),
+            'p50': percentile(times, 50),
+            'p90': percentile(times, 90),
+            'p99': percentile(times, 99),
+            'max': times[-1],
+            'nodes': nodes,
+            'nps': nodes / sum(times) if sum(times) > 0 else 0,
+            'depth': sum(depths) / len(depths) if depths else None,
+        }
+    return summaries
+
+def bucket_index(t, buckets=latency_buckets):
+    return next((i for i, bound in enumerate(buckets) if t <= bound), len(buckets))
+
+def histogram(times, buckets=latency_buckets):
+    """
+    Number of moves per latency bucket: [(upper bound in seconds or None for the rest, count)].
+    """
+    counts = [0] * (len(buckets) + 1)
+    for t in times:
+        counts[bucket_index(t, buckets)] += 1
+    return list(zip(list(buckets) + [None], counts))
+
+def print_histogram(histogram):
+    print("Move latency histogram:")
+    for bound, count in histogram:
+        if not count:
+            continue
+        label = f"<= {bound}s" if bound is not None else f"> {latency_buckets[-1]}s"
+        print(f"  {label:<9} {count}")
+
+def print_latency_report(moves):
+    summaries = latency_by_phase(moves)
+    if not summaries:
+        return
+    print("Move latency by phase:")
+    print(f"{'phase':<10} {'moves':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9} {'nodes':>11} {'nps':>9} {'depth':>6}")
+    ordered = [phase for phase in phases if phase in summaries] + sorted(set(summaries) - set(phases))
+    for phase in ordered:
+        s = summaries[phase]
+        depth = f"{s['depth']:.1f}" if s['depth'] is not None else '-'
+        print(f"{phase:<10} {s['moves']:>6} {s['p50']:>8.3f}s {s['p90']:>8.3f}s {s['p99']:>8.3f}s {s['max']:>8.3f}s "
+              f"{s['nodes']:>11} {s['nps']:>9.0f} {depth:>6}")
+    print_histogram(histogram([move['time'] for move in moves]))
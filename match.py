@@ -0,0 +1,141 @@
+"""
+Play a harness match over a pool of worker processes. Each worker builds its engine and opponent once and
+plays whole games; results are aggregated in the parent as they finish.
+
+    python match.py v3 --games 500 --workers 16
+    python match.py v3 --games 20000 --sprt 0 5   # Stop as soon as the SPRT accepts H0 or H1
+    python match.py v3 --openings suite.epd --results v3.db --resume   # Every opening twice, colours reversed
+"""
+import argparse
+import multiprocessing
+import os
+import chess
+from adjudication import add_adjudication_arguments, adjudicator_from_args
+from harness import MatchStats, play_game
+from headless import harnesses
+from openings import load_openings
+from results import config_hash, game_record, open_store
+from telemetry import open_events
+from sprt import Sprt
+from timecontrol import TimeControl
+
+# Engine, opponent, adjudicator and time control of this worker process, set once by init_worker()
+worker_engine = None
+worker_opponent = None
+worker_adjudicator = None
+worker_time_control = None
+
+def init_worker(harness, adjudicator=None, time_control=None):
+    global worker_engine, worker_opponent, worker_adjudicator, worker_time_control
+    config = harnesses[harness]
+    worker_engine = config['engine']()
+    worker_opponent = config['opponent']()
+    worker_adjudicator = adjudicator
+    worker_time_control = time_control
+
+def play_one(task):
+    game_index, ai_color, opening_id, board = task
+    white, black = (worker_engine, worker_opponent) if ai_color == chess.WHITE else (worker_opponent, worker_engine)
+    board = board or chess.Board()
+    moves = []
+    result = play_game(white, black, board, adjudicator=worker_adjudicator, moves=moves, time_control=worker_time_control)
+    return game_index, ai_color, opening_id, board, result, moves
+
+def schedule(harness, max_games, ai_color=None, alternate=False, openings=None):
+    """
+    With openings, games 2i and 2i + 1 both start from opening i (cycling through the suite) with colours
+    reversed. Otherwise every game starts from the initial position.
+    """
+    ai_color = harnesses[harness]['ai_color'] if ai_color is None else ai_color
+    for game_index in range(max_games):
+        if openings:
+            opening_id, board = openings[game_index // 2 % len(openings)]
+            board = board.copy()
+        else:
+            opening_id, board = None, None
+        yield game_index, ai_color if not (alternate or openings) or game_index % 2 == 0 else not ai_color, opening_id, board
+
+def run(harness, max_games=10, workers=None, ai_color=None, alternate=False, sprt=None, openings=None,
+        adjudicator=None, results=None, resume=False, time_control=None):
+    """
+    sprt is None or a Sprt; games are then played in pairs with colours reversed and the match stops as
+    soon as the test accepts H0 or H1. openings is a list of (opening_id, board) to start the pairs from.
+    Finished games are saved to the results store; with resume the games already in it for the same
+    configuration are counted and not played again.
+    """
+    workers = workers or os.cpu_count()
+    stats = MatchStats()
+    pair_scores = {}
+
+    def add_game(game_index, ai_color, result):
+        actual_score = stats.record(result, ai_color)
+        if sprt is None:
+            return
+        pair_index = game_index // 2
+        if pair_index not in pair_scores:
+            pair_scores[pair_index] = actual_score
+            return
+        sprt.add(pair_scores.pop(pair_index) + actual_score)
+
+    store = open_store(results) if results else None
+    alternate = alternate or sprt is not None
+    config_id = config_hash(harness, harnesses[harness], ai_color, alternate, [opening_id for opening_id, _ in openings or []],
+                            adjudicator, str(time_control) if time_control else None)
+    played = set()
+    if store and resume:
+        for game in store.games(config_id):
+            played.add(game['game'])
+            add_game(game['game'], game['ai_color'] == 'white', game['result'])
+            stats.add_moves(game['moves'], game['ai_color'] == 'white')
+        if played:
+            print(f"Resuming after {len(played)} games [+{stats.wins} -{stats.losses} ={stats.draws}]")
+
+    tasks = (task for task in schedule(harness, max_games, ai_color, alternate, openings) if task[0] not in played)
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(harness, adjudicator, time_control)) as pool:
+        for game_index, ai_color, opening_id, board, result, moves in pool.imap_unordered(play_one, tasks):
+            add_game(game_index, ai_color, result)
+            stats.add_moves(moves, ai_color)
+            if store:
+                store.add(game_record(config_id, game_index, ai_color, opening_id, board, result, moves))
+            print(f"Game {game_index + 1} ({'White' if ai_color == chess.WHITE else 'Black'}"
+                  f"{', ' + opening_id if opening_id else ''}): {result}  "
+                  f"[+{stats.wins} -{stats.losses} ={stats.draws}]", flush=True)
+            if sprt is not None and sprt.status():
+                break  # Leaving the with block terminates the games still running
+    if store:
+        store.close()
+    stats.print_summary()
+    if sprt is not None:
+        sprt.print_summary()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a harness match in parallel over a process pool.")
+    parser.add_argument('harness', choices=sorted(harnesses))
+    parser.add_argument('--games', type=int, help="number of games to play (default: 10, or each opening twice)")
+    parser.add_argument('--workers', type=int, help="number of worker processes (default: one per core)")
+    parser.add_argument('--ai-color', choices=['white', 'black'], help="colour of our engine (default: as in the harness)")
+    parser.add_argument('--alternate', action='store_true', help="swap colours every game")
+    parser.add_argument('--tc', type=TimeControl.parse, help="time control [moves/]base[+increment] in seconds, e.g. 60+0.6")
+    parser.add_argument('--sprt', nargs=2, type=float, metavar=('ELO0', 'ELO1'), help="stop when the SPRT accepts H0 (ELO0) or H1 (ELO1), --games is the cap")
+    parser.add_argument('--alpha', type=float, default=0.05, help="SPRT false positive rate")
+    parser.add_argument('--beta', type=float, default=0.05, help="SPRT false negative rate")
+    parser.add_argument('--openings', help="EPD or PGN opening suite, every opening is played twice with colours reversed")
+    parser.add_argument('--results', help="results store (.jsonl, or .db for SQLite) every finished game is saved to")
+    parser.add_argument('--resume', action='store_true', help="count the games already in the results store instead of replaying them")
+    parser.add_argument('--events', help="JSON lines file every move and game is appended to")
+    add_adjudication_arguments(parser)
+    args = parser.parse_args()
+
+    if args.events:
+        open_events(args.events)
+
+    ai_color = None if args.ai_color is None else args.ai_color == 'white'
+    sprt = Sprt(args.sprt[0], args.sprt[1], args.alpha, args.beta) if args.sprt else None
+    openings = load_openings(args.openings) if args.openings else None
+    max_games = args.games if args.games is not None else 2 * len(openings) if openings else 10
+    run(args.harness, max_games, args.workers, ai_color, args.alternate, sprt, openings, adjudicator_from_args(args),
+        args.results, args.resume, args.tc)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Opening suites for paired matches. Each opening is played twice with colours reversed, which cancels most of
+the luck of the opening and makes every pair of games far more informative than two games from the start.
+"""
+import os
+import chess
+
+def load_epd(filename):
+    openings = []
+    with open(filename) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            board, operations = chess.Board.from_epd(line)
+            openings.append((str(operations.get('id', line_number)), board))
+    return openings
+
+def load_pgn(filename):
+    """
+    Every game of the file is an opening; the position after its last move is where the match game starts.
+    The moves are kept on the board so books and UCI opponents see the whole line.
+    """
+    import chess.pgn
+
+    openings = []
+    with open(filename) as f:
+        while True:
+            game = chess.pgn.read_game(f)
+            if game is None:
+                break
+            board = game.end().board()
+            opening_id = game.headers.get('Opening') or game.headers.get('ECO') or ''
+            openings.append((f"{len(openings) + 1}{' ' + opening_id if opening_id else ''}", board))
+    return openings
+
+def load_openings(filename):
+    if os.path.splitext(filename)[1].lower() == '.pgn':
+        return load_pgn(filename)
+    return load_epd(filename)
@@ -0,0 +1,194 @@
+"""
+UCI opponents (Stockfish or any other UCI binary) that are started once per process and reused across games.
+"""
+import atexit
+import subprocess
+import chess
+
+class EngineCrashed(Exception):
+    pass
+
+mate_score = 100000
+
+# What the stockfish package's Stockfish() sets on start, so presets keep the strength they had with it. Options
+# an engine doesn't have are ignored by it.
+stockfish_defaults = {
+    'Threads': 1,  # Before Hash, as the package does
+    'Hash': 16,
+    'Ponder': False,
+    'MultiPV': 1,
+    'Skill Level': 20,
+    'Move Overhead': 10,
+    'Slow Mover': 100,
+    'UCI_Chess960': False,
+    'UCI_LimitStrength': False,
+    'UCI_Elo': 1350,
+    'Contempt': 0,
+    'Min Split Depth': 0,
+    'Minimum Thinking Time': 20,
+}
+
+def parse_score(tokens):
+    """
+    Centipawns from an info line's 'score cp N' / 'score mate N', from the side to move's point of view.
+    """
+    if tokens[0] == 'cp':
+        return int(tokens[1])
+    if tokens[0] == 'mate':
+        mate = int(tokens[1])
+        return mate_score - abs(mate) if mate > 0 else -mate_score + abs(mate)
+    return None
+
+class UciOpponent:
+    """
+    A UCI engine process. Positions are sent as 'position startpos moves ...' from the game's move list, the
+    hash is only cleared (ucinewgame) when a new game starts, and the process is restarted if it dies.
+    """
+    def __init__(self, path='stockfish', options=None, depth=15, movetime=None):
+        self.path = path
+        self.options = options or {}
+        self.depth = depth
+        self.movetime = movetime
+        self.process = None
+        self.root = None
+        self.moves = None  # Moves of the game the engine is currently in
+        self.restarts = 0
+
+    def send(self, line):
+        try:
+            self.process.stdin.write(line + '\n')
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise EngineCrashed(self.path) from e
+
+    def read_until(self, prefix):
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise EngineCrashed(self.path)
+            if line.startswith(prefix):
+                return line.strip()
+
+    def start(self):
+        self.process = subprocess.Popen([self.path], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, text=True, bufsize=1)
+        self.send('uci')
+        self.read_until('uciok')
+        for name, value in self.options.items():
+            value = str(value).lower() if isinstance(value, bool) else value
+            self.send(f'setoption name {name} value {value}')
+        self.moves = None
+        self.wait_ready()
+
+    def wait_ready(self):
+        self.send('isready')
+        self.read_until('readyok')
+
+    def restart(self):
+        self.quit()
+        self.restarts += 1
+        self.start()
+
+    def new_game(self, root):
+        self.send('ucinewgame')
+        self.wait_ready()
+        self.root = root
+        self.moves = []
+
+    def position_command(self, board):
+        root = board.root()
+        moves = ' '.join(move.uci() for move in board.move_stack)
+        start = 'startpos' if root == chess.Board() else f'fen {root.fen()}'
+        return f'position {start} moves {moves}' if moves else f'position {start}'
+
+    def go_command(self, limits=None):
+        if limits:
+            command = (f"go wtime {int(limits['wtime'] * 1000)} btime {int(limits['btime'] * 1000)} "
+                       f"winc {int(limits['winc'] * 1000)} binc {int(limits['binc'] * 1000)}")
+            return command + f" movestogo {limits['movestogo']}" if limits['movestogo'] else command
+        if self.movetime is not None:
+            return f'go movetime {int(self.movetime * 1000)}'
+        return f'go depth {self.depth}'
+
+    def best_move(self, board, limits=None):
+        return self.search(board, limits)[0]
+
+    def search(self, board, limits=None):
+        """
+        Return the best move and a dict with the last reported score (in centipawns from White's point of
+        view), depth and nodes. With clock limits (see timecontrol.ChessClock) the engine manages its own
+        time, otherwise it searches to the fixed depth or movetime.
+        """
+        for attempt in range(2):
+            try:
+                if self.process is None:
+                    self.start()
+                elif self.process.poll() is not None:
+                    self.restart()
+                # A move list that doesn't continue the previous one means a new game
+                if self.moves is None or board.root() != self.root or board.move_stack[:len(self.moves)] != self.moves:
+                    self.new_game(board.root())
+                self.send(self.position_command(board))
+                self.send(self.go_command(limits))
+                info = {}
+                while True:
+                    line = self.read_until(('info', 'bestmove')).split()
+                    if line[0] == 'bestmove':
+                        break
+                    if 'score' in line:
+                        score = parse_score(line[line.index('score') + 1:])
+                        info['score'] = -score if score is not None and board.turn == chess.BLACK else score
+                    for name in ('depth', 'nodes'):
+                        if name in line:
+                            info[name] = int(line[line.index(name) + 1])
+                bestmove = line[1]
+                self.moves = list(board.move_stack)
+                return None if bestmove == '(none)' else chess.Move.from_uci(bestmove), info
+            except EngineCrashed:
+                self.process.kill()
+                self.process.wait()
+                if attempt:
+                    raise
+
+    def quit(self):
+        if self.process is None:
+            return
+        try:
+            self.send('quit')
+            self.process.wait(timeout=1)
+        except (EngineCrashed, subprocess.TimeoutExpired):
+            self.process.kill()
+        self.process = None
+
+def stockfish_settings(skill_level=None, elo=None, **options):
+    """
+    UCI options of a Stockfish opponent, see get_opponent().
+    """
+    settings = dict(stockfish_defaults)
+    if skill_level is not None:
+        settings.update({'Skill Level': skill_level, 'UCI_LimitStrength': False})
+    if elo is not None:
+        settings.update({'UCI_Elo': elo, 'UCI_LimitStrength': True})
+    settings.update(options)
+    return settings
+
+# Opponents started by this process, keyed by path and settings
+opponent_pool = {}
+
+def get_opponent(path='stockfish', skill_level=None, elo=None, depth=15, movetime=None, **options):
+    """
+    The opponent of this process with these settings. options are UCI options by name, on top of
+    stockfish_defaults; skill_level and elo are set the way the stockfish package's set_skill_level() and
+    set_elo_rating() set them.
+    """
+    settings = stockfish_settings(skill_level, elo, **options)
+    key = (path, depth, movetime, tuple(sorted(settings.items())))
+    if key not in opponent_pool:
+        opponent_pool[key] = UciOpponent(path, settings, depth, movetime)
+    return opponent_pool[key]
+
+@atexit.register
+def close_opponents():
+    for opponent in opponent_pool.values():
+        opponent.quit()
+    opponent_pool.clear()
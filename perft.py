@@ -0,0 +1,109 @@
+"""
+Perft: counts the leaf nodes of the legal move tree to a fixed depth, to check move generation against known
+counts and to measure its raw speed. The last ply is bulk counted (the number of legal moves is added
+without making them).
+
+    python perft.py                          # Every standard position to depth 3, verified
+    python perft.py --position kiwipete --depth 4 --divide
+    python perft.py --fen "8/8/8/8/8/8/6k1/4K2R w K - 0 1" --depth 5
+"""
+import argparse
+import sys
+import time
+import chess
+
+# Standard perft positions with their known node counts at depth 1, 2, ...
+positions = {
+    'start': (chess.STARTING_FEN, [20, 400, 8902, 197281, 4865609]),
+    'kiwipete': ('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1', [48, 2039, 97862, 4085603]),
+    'position3': ('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', [14, 191, 2812, 43238, 674624]),
+    'position4': ('r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1', [6, 264, 9467, 422333]),
+    'position5': ('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8', [44, 1486, 62379, 2103487]),
+    'position6': ('r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10', [46, 2079, 89890, 3894594]),
+}
+
+def perft(board, depth):
+    if depth == 0:
+        return 1
+    if depth == 1:
+        return board.legal_moves.count()  # Bulk counting
+    nodes = 0
+    for move in board.legal_moves:
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+# Move generators to compare: name -> function(board, depth) returning the perft count
+generators = {
+    'python-chess': perft,
+}
+
+def divide(board, depth, generator=perft):
+    """
+    Perft of every root move, to find where two generators disagree.
+    """
+    counts = {}
+    for move in board.legal_moves:
+        board.push(move)
+        counts[move.uci()] = generator(board, depth - 1)
+        board.pop()
+    return counts
+
+def run_perft(fen, depth, generator=perft, expected=None, show_divide=False):
+    """
+    Returns (nodes, seconds, ok) where ok is None when the count isn't known.
+    """
+    board = chess.Board(fen)
+    start_time = time.time()
+    if show_divide:
+        counts = divide(board, depth, generator)
+        nodes = sum(counts.values())
+    else:
+        nodes = generator(board, depth)
+    elapsed = time.time() - start_time
+    if show_divide:
+        for move, count in sorted(counts.items()):
+            print(f"  {move}: {count}")
+    return nodes, elapsed, None if expected is None else nodes == expected
+
+def positive_depth(text):
+    depth = int(text)
+    if depth < 1:
+        raise argparse.ArgumentTypeError(f"depth must be at least 1, not {depth}")
+    return depth
+
+def main():
+    parser = argparse.ArgumentParser(description="Count and time move generation on the standard perft positions.")
+    parser.add_argument('--depth', type=positive_depth, default=3, help="perft depth (capped to the known counts of each standard position)")
+    parser.add_argument('--position', choices=sorted(positions), action='append', help="standard position (default: all of them)")
+    parser.add_argument('--fen', help="any other position, its count can't be verified")
+    parser.add_argument('--generator', choices=sorted(generators), action='append', help="move generator (default: all of them)")
+    parser.add_argument('--divide', action='store_true', help="print the count of every root move")
+    args = parser.parse_args()
+
+    if args.fen:
+        runs = [('fen', args.fen, args.depth, None)]
+    else:
+        runs = []
+        for name in args.position or positions:
+            fen, counts = positions[name]
+            depth = min(args.depth, len(counts))
+            runs.append((name, fen, depth, counts[depth - 1]))
+
+    failed = False
+    for generator_name in args.generator or generators:
+        total_nodes, total_time = 0, 0.0
+        print(f"Generator: {generator_name}")
+        for name, fen, depth, expected in runs:
+            nodes, elapsed, ok = run_perft(fen, depth, generators[generator_name], expected, args.divide)
+            total_nodes += nodes
+            total_time += elapsed
+            status = '' if ok is None else ' ok' if ok else f" FAIL (expected {expected})"
+            failed = failed or ok is False
+            print(f"{name:<10} depth {depth}: {nodes:>10} nodes {elapsed:8.3f}s {nodes / elapsed if elapsed else 0:>10.0f} nps{status}")
+        print(f"Total: {total_nodes} nodes in {total_time:.3f}s, {total_nodes / total_time if total_time else 0:.0f} nps")
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
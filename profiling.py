@@ -0,0 +1,167 @@
+"""
+Profiling of the engine's searches, switched on with environment variables so no code has to change:
+
+    CHESS_PROFILE=cprofile python headless.py v3 --games 2   # Deterministic, every call counted
+    CHESS_PROFILE=sample python bench.py                      # Statistical, low overhead
+    CHESS_PROFILE_DIR=profiles                                # Where the files go (default: profiles)
+
+cprofile writes <pid>.prof (open with pstats or snakeviz), sample writes <pid>.collapsed stacks for
+flamegraph.pl or speedscope. Both print the time spent in move generation, move ordering, evaluation,
+tablebase and book probes when the process exits. Files are also refreshed every few seconds, since pool
+workers may be terminated without running exit handlers.
+"""
+import atexit
+import cProfile
+import functools
+import os
+import pstats
+import sys
+import threading
+import time
+
+profile_mode = os.environ.get('CHESS_PROFILE', '').lower() or None
+profile_directory = os.environ.get('CHESS_PROFILE_DIR', 'profiles')
+sample_interval = 0.001  # Seconds between two samples
+dump_interval = 5  # Seconds between two refreshes of the files
+
+# Where time goes: the innermost frame of a sample that matches decides its category
+categories = (
+    ('book', lambda filename, function: filename.endswith('book.py') or 'polyglot' in filename),
+    ('tablebase', lambda filename, function: function == 'probe_tablebase' or 'syzygy' in filename),
+    ('movegen', lambda filename, function: 'chess' in filename and ('generate' in function or 'legal' in function)),
+    ('ordering', lambda filename, function: function in ('order_moves', 'gen_children')),
+    ('eval', lambda filename, function: function == 'evaluate_board'),
+)
+
+def categorize(stack):
+    """
+    stack is a list of (filename, function name), innermost first.
+    """
+    for filename, function in stack:
+        for category, matches in categories:
+            if matches(filename, function):
+                return category
+    return 'search'
+
+class Sampler:
+    def __init__(self, interval=sample_interval):
+        self.interval = interval
+        self.stacks = {}  # Collapsed stack -> samples
+        self.category_samples = {}
+        self.thread_id = None
+        self.active = threading.Event()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+
+    def sample(self):
+        while True:
+            self.active.wait()
+            time.sleep(self.interval)
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or not self.active.is_set():
+                continue
+            stack = []
+            while frame is not None:
+                stack.append((frame.f_code.co_filename, frame.f_code.co_name))
+                frame = frame.f_back
+            collapsed = ';'.join(f"{function} ({os.path.basename(filename)})" for filename, function in reversed(stack))
+            self.stacks[collapsed] = self.stacks.get(collapsed, 0) + 1
+            category = categorize(stack)
+            self.category_samples[category] = self.category_samples.get(category, 0) + 1
+
+    def enable(self):
+        self.thread_id = threading.get_ident()
+        self.active.set()
+
+    def disable(self):
+        self.active.clear()
+
+    def dump(self, filename):
+        with open(filename + '.collapsed', 'w') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+    def breakdown(self):
+        return dict(self.category_samples)
+
+class CProfiler:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def enable(self):
+        self.profile.enable()
+
+    def disable(self):
+        self.profile.disable()
+
+    def dump(self, filename):
+        self.profile.dump_stats(filename + '.prof')
+
+    def breakdown(self):
+        """
+        Cumulative time of the function each category starts at. They overlap: move generation is also
+        counted in ordering, tablebase probes in evaluation.
+        """
+        entry_points = {'probe': 'book', 'probe_tablebase': 'tablebase', 'generate_legal_moves': 'movegen',
+                        'order_moves': 'ordering', 'gen_children': 'ordering', 'evaluate_board': 'eval'}
+        stats = pstats.Stats(self.profile).stats
+        totals = {}
+        for (filename, _, function), (_, _, _, cumulative_time, _) in stats.items():
+            category = entry_points.get(function)
+            if category and (category != 'book' or filename.endswith('book.py')):
+                totals[category] = totals.get(category, 0) + cumulative_time
+        totals['total'] = sum(own_time for (_, _, own_time, _, _) in stats.values())
+        return totals
+
+profiler = None
+depth = 0  # Nested profiled calls, only the outermost switches the profiler on and off
+last_dump = 0.0
+
+def get_profiler():
+    global profiler
+    if profiler is None:
+        profiler = Sampler() if profile_mode == 'sample' else CProfiler()
+        atexit.register(report)
+    return profiler
+
+def profiled(func):
+    """
+    Decorator for engine entry points; returns func itself unless profiling is switched on.
+    """
+    if profile_mode not in ('cprofile', 'sample'):
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global depth, last_dump
+        current = get_profiler()
+        depth += 1
+        if depth == 1:
+            current.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            depth -= 1
+            if depth == 0:
+                current.disable()
+                if time.time() - last_dump > dump_interval:
+                    last_dump = time.time()
+                    dump()
+    return wrapper
+
+def dump():
+    os.makedirs(profile_directory, exist_ok=True)
+    profiler.dump(os.path.join(profile_directory, str(os.getpid())))
+
+def report():
+    if profiler is None:
+        return
+    dump()
+    breakdown = profiler.breakdown()
+    total = breakdown.pop('total', None) or sum(breakdown.values())
+    if not total:
+        return
+    unit = 'samples' if profile_mode == 'sample' else 'seconds'
+    print(f"Search profile ({profile_mode}, process {os.getpid()}):", file=sys.stderr)
+    for category, value in sorted(breakdown.items(), key=lambda item: item[1], reverse=True):
+        print(f"  {category:<10} {value:>10g} {unit} {100 * value / total:5.1f}%", file=sys.stderr)
@@ -0,0 +1,177 @@
+"""
+Store of finished harness games, so a long match can be stopped and resumed without replaying anything.
+Files ending in .db/.sqlite are SQLite databases, anything else is JSON lines.
+
+    python results.py v3.jsonl   # Summary of every configuration in the store
+"""
+import argparse
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import chess
+from harness import MatchStats
+from sprt import Pentanomial
+
+def describe(value):
+    """
+    JSON friendly description of a harness setting, e.g. functools.partial(aiv3_player, max_depth=4).
+    """
+    if isinstance(value, dict):
+        return {str(key): describe(arg) for key, arg in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [describe(arg) for arg in value]
+    if isinstance(value, functools.partial):
+        return [describe(value.func), [describe(arg) for arg in value.args],
+                {key: describe(arg) for key, arg in sorted(value.keywords.items())}]
+    if callable(value):
+        return f"{value.__module__}.{value.__qualname__}"
+    if hasattr(value, '__dict__'):
+        return {key: describe(arg) for key, arg in sorted(vars(value).items())}
+    return value
+
+def config_hash(*settings):
+    return hashlib.sha1(json.dumps(describe(list(settings)), sort_keys=True, default=repr).encode()).hexdigest()[:12]
+
+def game_record(config, game_index, ai_color, opening_id, board, result, moves):
+    """
+    moves is the list of per-move dicts filled in by harness.play_game.
+    """
+    import chess.pgn  # Pulls in chess.engine and asyncio, only needed once a game is saved
+
+    game = chess.pgn.Game.from_board(board)
+    game.headers['Result'] = result
+    if opening_id:
+        game.headers['Opening'] = opening_id
+    return {
+        'config': config,
+        'game': game_index,
+        'opening': opening_id,
+        'ai_color': 'white' if ai_color == chess.WHITE else 'black',
+        'result': result,
+        'pgn': str(game),
+        'moves': moves,
+        'finished': time.time(),
+    }
+
+class JsonlStore:
+    """
+    Games are appended; a game saved again (same configuration and game index, e.g. a run repeated without
+    resume) replaces the earlier record, like the SQLite store's primary key does.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+
+    def records(self, config=None):
+        """
+        (file offset, game) of every readable line, duplicates included.
+        """
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, 'rb') as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    return
+                if not line.strip():
+                    continue
+                try:
+                    game = json.loads(line)
+                except ValueError:
+                    continue  # Line cut short by a crash
+                if config is None or game['config'] == config:
+                    yield offset, game
+
+    def games(self, config=None):
+        # First pass: the last record of every game, by offset only so memory stays small
+        latest = {}
+        for offset, game in self.records(config):
+            latest[game['config'], game['game']] = offset
+        for offset, game in self.records(config):
+            if latest[game['config'], game['game']] == offset:
+                yield game
+
+    def add(self, game):
+        with open(self.filename, 'ab+') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end:
+                f.seek(end - 1)
+                if f.read(1) != b'\n':  # Line cut short by a crash, don't glue this game onto it
+                    f.write(b'\n')
+            f.write((json.dumps(game) + '\n').encode())
+
+    def close(self):
+        pass
+
+class SqliteStore:
+    columns = ('config', 'game', 'opening', 'ai_color', 'result', 'pgn', 'moves', 'finished')
+
+    def __init__(self, filename):
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS games (config TEXT, game INTEGER, opening TEXT, '
+                                'ai_color TEXT, result TEXT, pgn TEXT, moves TEXT, finished REAL, '
+                                'PRIMARY KEY (config, game))')
+
+    def games(self, config=None):
+        query = f"SELECT {', '.join(self.columns)} FROM games"
+        cursor = self.connection.execute(query + ' WHERE config = ? ORDER BY game', (config,)) if config else \
+            self.connection.execute(query + ' ORDER BY config, game')
+        for row in cursor:
+            game = dict(zip(self.columns, row))
+            game['moves'] = json.loads(game['moves'])
+            yield game
+
+    def add(self, game):
+        row = dict(game, moves=json.dumps(game['moves']))
+        with self.connection:
+            self.connection.execute(f"INSERT OR REPLACE INTO games VALUES ({', '.join('?' * len(self.columns))})",
+                                    [row[column] for column in self.columns])
+
+    def close(self):
+        self.connection.close()
+
+def open_store(filename):
+    if os.path.splitext(filename)[1].lower() in ('.db', '.sqlite', '.sqlite3'):
+        return SqliteStore(filename)
+    return JsonlStore(filename)
+
+def summarize(store, config=None):
+    """
+    Totals per configuration, streamed over the store so memory stays flat however many games it holds.
+    """
+    summaries = {}
+    pair_scores = {}
+    for game in store.games(config):
+        stats, pentanomial = summaries.setdefault(game['config'], (MatchStats(keep_moves=False), Pentanomial()))
+        actual_score = stats.record(game['result'], game['ai_color'] == 'white')
+        stats.add_moves(game['moves'], game['ai_color'] == 'white')
+        pair = (game['config'], game['game'] // 2)
+        if pair in pair_scores:
+            pentanomial.add(pair_scores.pop(pair) + actual_score)
+        else:
+            pair_scores[pair] = actual_score
+    return summaries
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a store of harness games.")
+    parser.add_argument('filename')
+    parser.add_argument('--config', help="only this configuration hash")
+    args = parser.parse_args()
+
+    store = open_store(args.filename)
+    for config, (stats, pentanomial) in summarize(store, args.config).items():
+        print(f"Configuration {config}")
+        stats.print_summary()
+        if pentanomial.pairs:
+            elo, error = pentanomial.elo()
+            print(f"Pentanomial [0, 0.5, 1, 1.5, 2]: {pentanomial.counts}")
+            print(f"Elo: {elo:.1f} +/- {error:.1f} (95%)")
+            print(f"LOS: {pentanomial.los() * 100:.1f}%")
+        print()
+    store.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Statistics of one search, filled in by the engine as it goes: what the search spent its nodes on and how well
+the move ordering and pruning worked.
+"""
+import time
+
+class SearchStats:
+    def __init__(self, root_ply=0):
+        self.root_ply = root_ply  # len(board.move_stack) at the root, to measure the selective depth
+        self.start_time = time.time()
+        self.nodes = 0
+        self.seldepth = 0  # Deepest ply reached
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0  # Cutoffs by the first move searched
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0
+        self.tb_hits = 0  # Positions evaluated from the tablebases
+        self.eval_hits = 0  # Leaf evaluations found in the evaluation cache
+        self.depth = 0  # Last completed iteration
+        self.iterations = []  # Dict per completed iteration
+
+    def end_iteration(self, depth, score, move):
+        self.depth = depth
+        self.iterations.append({
+            'depth': depth,
+            'score': score,
+            'move': move.uci() if move else None,
+            'nodes': self.nodes,
+            'seldepth': self.seldepth,
+            'time': time.time() - self.start_time,
+        })
+
+    @property
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0
+
+    @property
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def branching_factor(self, index=-1):
+        """
+        Effective branching factor of an iteration: its nodes over the nodes of the iteration before.
+        """
+        if not self.iterations:
+            return None
+        index = index % len(self.iterations)
+        if index == 0:
+            return None
+        nodes = self.iterations[index]['nodes'] - self.iterations[index - 1]['nodes']
+        previous = self.iterations[index - 1]['nodes'] - (self.iterations[index - 2]['nodes'] if index > 1 else 0)
+        return nodes / previous if previous else None
+
+    def iteration_line(self, index=-1):
+        iteration = self.iterations[index]
+        ebf = self.branching_factor(index)
+        return (f"depth {iteration['depth']} seldepth {iteration['seldepth']} score {iteration['score']} "
+                f"nodes {iteration['nodes']} time {iteration['time']:.3f}s move {iteration['move']} "
+                f"ebf {f'{ebf:.2f}' if ebf is not None else '-'}")
+
+    def summary(self):
+        return {
+            'nodes': self.nodes,
+            'depth': self.depth,
+            'seldepth': self.seldepth,
+            'beta_cutoffs': self.beta_cutoffs,
+            'first_move_cutoff_rate': self.first_move_cutoff_rate,
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'tt_cutoffs': self.tt_cutoffs,
+            'tb_hits': self.tb_hits,
+            'eval_hits': self.eval_hits,
+            'ebf': self.branching_factor(),
+        }
+
+    def __str__(self):
+        ebf = self.branching_factor()
+        return (f"nodes {self.nodes} depth {self.depth} seldepth {self.seldepth} "
+                f"cutoffs {self.beta_cutoffs} ({self.first_move_cutoff_rate * 100:.1f}% first move) "
+                f"tt {self.tt_hits}/{self.tt_probes} hits, {self.tt_cutoffs} cutoffs tb {self.tb_hits} "
+                f"eval hits {self.eval_hits} "
+                f"ebf {f'{ebf:.2f}' if ebf is not None else '-'}")
@@ -0,0 +1,111 @@
+"""
+Sequential probability ratio test over paired games (same opening, colours reversed). Each pair scores
+0, 0.5, 1, 1.5 or 2 points for our engine and the five counts (the pentanomial) are what the statistics use.
+"""
+import math
+from statistics import NormalDist
+
+def elo_to_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+def score_to_elo(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+def sprt_bounds(alpha=0.05, beta=0.05):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+class Pentanomial:
+    def __init__(self):
+        self.counts = [0, 0, 0, 0, 0]  # Pairs scoring 0, 0.5, 1, 1.5 and 2 points
+
+    def add(self, pair_score):
+        self.counts[int(pair_score * 2)] += 1
+
+    @property
+    def pairs(self):
+        return sum(self.counts)
+
+    def mean_variance(self):
+        """
+        Mean and variance of the per-game score of a pair (pair points / 2, so between 0 and 1).
+        """
+        if self.pairs == 0:
+            return 0.5, 0.0
+        # Empty outcomes get a tiny count so a one-sided result still has a (small) variance
+        counts = [count or 1e-3 for count in self.counts]
+        n = sum(counts)
+        mean = sum(count * i / 4 for i, count in enumerate(counts)) / n
+        variance = sum(count * (i / 4 - mean) ** 2 for i, count in enumerate(counts)) / n
+        return mean, variance
+
+    def elo(self, confidence=0.95):
+        """
+        Elo difference and the half width of its confidence interval.
+        """
+        mean, variance = self.mean_variance()
+        if self.pairs < 2 or variance == 0:
+            return score_to_elo(mean), math.inf
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        stderr = math.sqrt(variance / self.pairs)
+        low = score_to_elo(mean - z * stderr)
+        high = score_to_elo(mean + z * stderr)
+        return score_to_elo(mean), (high - low) / 2
+
+    def los(self):
+        """
+        Likelihood of superiority: probability that our engine is the stronger one.
+        """
+        mean, variance = self.mean_variance()
+        if variance == 0:
+            return 0.5 if mean == 0.5 else float(mean > 0.5)
+        return NormalDist().cdf((mean - 0.5) / math.sqrt(variance / self.pairs))
+
+    def llr(self, elo0, elo1):
+        """
+        Log likelihood ratio of H1 (elo1) against H0 (elo0), normal approximation of the GSPRT.
+        """
+        mean, variance = self.mean_variance()
+        if variance == 0:
+            return 0.0
+        score0, score1 = elo_to_score(elo0), elo_to_score(elo1)
+        return self.pairs * (score1 - score0) * (2 * mean - score0 - score1) / (2 * variance)
+
+class Sprt:
+    def __init__(self, elo0=0, elo1=5, alpha=0.05, beta=0.05, min_pairs=10):
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.lower, self.upper = sprt_bounds(alpha, beta)
+        self.min_pairs = min_pairs  # Too few pairs give a meaningless variance estimate
+        self.pentanomial = Pentanomial()
+
+    def add(self, pair_score):
+        self.pentanomial.add(pair_score)
+
+    def status(self):
+        """
+        'H0' or 'H1' once one of them is accepted, None while the test is still running.
+        """
+        if self.pentanomial.pairs < self.min_pairs:
+            return None
+        llr = self.pentanomial.llr(self.elo0, self.elo1)
+        if llr <= self.lower:
+            return 'H0'
+        if llr >= self.upper:
+            return 'H1'
+        return None
+
+    def print_summary(self):
+        elo, error = self.pentanomial.elo()
+        llr = self.pentanomial.llr(self.elo0, self.elo1)
+        print(f"Pentanomial [0, 0.5, 1, 1.5, 2]: {self.pentanomial.counts}")
+        print(f"Elo: {elo:.1f} +/- {error:.1f} (95%)")
+        print(f"LOS: {self.pentanomial.los() * 100:.1f}%")
+        print(f"LLR: {llr:.2f} ({self.lower:.2f}, {self.upper:.2f}) [{self.elo0}, {self.elo1}]")
+        status = self.status()
+        if status == 'H1':
+            print("SPRT: H1 accepted")
+        elif status == 'H0':
+            print("SPRT: H0 accepted")
+        else:
+            print("SPRT: no decision")
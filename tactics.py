@@ -0,0 +1,112 @@
+"""
+Tactical test suites: searches every position of an EPD file (WAC, ECM, STS style) with the v3 engine over a
+pool of worker processes and checks the move against its 'bm' (best move) or 'am' (avoid move) operation.
+
+A position counts as solved from the iteration where the engine settled on a right move and kept it to the
+end of the search; the time and nodes spent up to then are its time and nodes to solution.
+
+    python tactics.py wac.epd --movetime 5
+    python tactics.py ecm.epd --depth 4 --workers 8
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import time
+import chess
+import aiv3
+from timeman import TimeManager
+
+def load_suite(filename):
+    """
+    Returns [(id, board, best moves, moves to avoid)] for the positions that have a bm or am operation.
+    """
+    suite = []
+    with open(filename) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            board, operations = chess.Board.from_epd(line)
+            best_moves = operations.get('bm') or []
+            avoid_moves = operations.get('am') or []
+            if best_moves or avoid_moves:
+                suite.append((str(operations.get('id', line_number)), board, best_moves, avoid_moves))
+    return suite
+
+def is_solution(move, best_moves, avoid_moves):
+    if best_moves:
+        return move in best_moves
+    return move not in avoid_moves
+
+def solve(task):
+    position_id, board, best_moves, avoid_moves, max_depth, movetime = task
+    iterations = []  # (depth, move, seconds, nodes) of every completed iteration
+    start_time = time.time()
+
+    def on_iteration(depth, score, move):
+        iterations.append((depth, move, time.time() - start_time, aiv3.stats.nodes))
+
+    time_manager = TimeManager.from_movetime(movetime or math.inf)
+    _, move, stats = aiv3.search(board, max_depth, time_manager, on_iteration)
+    elapsed = time.time() - start_time
+    solved = is_solution(move, best_moves, avoid_moves)
+
+    # Earliest iteration from which every later iteration has a right move
+    solution = (stats.depth, elapsed, stats.nodes) if solved else None
+    for iteration_depth, iteration_move, seconds, nodes in reversed(iterations):
+        if not is_solution(iteration_move, best_moves, avoid_moves):
+            break
+        solution = (iteration_depth, seconds, nodes)
+    return {
+        'id': position_id,
+        'move': board.san(move) if move else None,
+        'expected': ' '.join(board.san(m) for m in best_moves) if best_moves else 'not ' + ' '.join(board.san(m) for m in avoid_moves),
+        'solved': solved,
+        'depth': stats.depth,
+        'time': elapsed,
+        'nodes': stats.nodes,
+        'solution_depth': solution[0] if solution else None,
+        'solution_time': solution[1] if solution else None,
+        'solution_nodes': solution[2] if solution else None,
+    }
+
+def run(suite, max_depth=64, movetime=None, workers=None):
+    workers = workers or os.cpu_count()
+    tasks = [(position_id, board, best_moves, avoid_moves, max_depth, movetime)
+             for position_id, board, best_moves, avoid_moves in suite]
+    results = []
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap(solve, tasks):
+            results.append(result)
+            if result['solved']:
+                status = f"solved at depth {result['solution_depth']} in {result['solution_time']:.2f}s, {result['solution_nodes']} nodes"
+            else:
+                status = "FAILED"
+            print(f"{result['id']:<12} {result['move'] or '-':<8} (expected {result['expected']}) {status}", flush=True)
+    print_summary(results)
+    return results
+
+def print_summary(results):
+    solved = [result for result in results if result['solved']]
+    total_time = sum(result['time'] for result in results)
+    total_nodes = sum(result['nodes'] for result in results)
+    print(f"Solved: {len(solved)}/{len(results)} ({100 * len(solved) / len(results) if results else 0:.1f}%)")
+    if solved:
+        print(f"Average time to solution: {sum(result['solution_time'] for result in solved) / len(solved):.3f} seconds")
+        print(f"Average nodes to solution: {sum(result['solution_nodes'] for result in solved) / len(solved):.0f}")
+    print(f"Total time: {total_time:.3f} seconds, nodes: {total_nodes}, nodes/second: {total_nodes / total_time if total_time else 0:.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an EPD tactical test suite with the v3 engine.")
+    parser.add_argument('suite', help="EPD file with bm or am operations")
+    parser.add_argument('--movetime', type=float, help="seconds per position (default: 5 unless --depth is given)")
+    parser.add_argument('--depth', type=int, help="maximum search depth")
+    parser.add_argument('--workers', type=int, help="number of worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    movetime = args.movetime if args.movetime or args.depth else 5
+    run(load_suite(args.suite), args.depth or 64, movetime, args.workers)
+
+if __name__ == '__main__':
+    main()
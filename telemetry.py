@@ -0,0 +1,81 @@
+"""
+Logging and telemetry. Nothing in the search prints: things that happen per node are counted, and moves
+and games are logged with a level, so how much is written is a setting rather than a code change.
+
+    CHESS_LOG_LEVEL=WARNING python v3eval.py   # Only warnings and errors (default: INFO)
+    CHESS_LOG_LEVEL=DEBUG python headless.py v3  # Every move of every game and every iteration
+    CHESS_EVENTS=events.jsonl python match.py v3  # JSON event stream, one line per move and per game
+
+The event stream is appended to with single writes, so every worker process of a match can share it.
+"""
+import collections
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+
+log = logging.getLogger('chess')
+if not log.handlers:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(handler)
+    log.propagate = False
+try:
+    log.setLevel(os.environ.get('CHESS_LOG_LEVEL', 'INFO').upper())
+except ValueError:  # Unknown level name
+    log.setLevel(logging.INFO)
+    log.warning(f"Unknown CHESS_LOG_LEVEL {os.environ['CHESS_LOG_LEVEL']!r}, logging at INFO")
+
+def log_to(stream):
+    """
+    Write the log to stream instead, e.g. stderr when stdout carries the program's output.
+    """
+    for handler in log.handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(stream)
+
+counters = collections.Counter()  # Process-wide totals, e.g. counters['tablebase_hits']
+
+events_fd = None
+game_numbers = itertools.count(1)
+
+def open_events(filename):
+    """
+    Start the JSON event stream. Worker processes started afterwards write to the same file.
+    """
+    global events_fd
+    events_fd = os.open(filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    os.environ['CHESS_EVENTS'] = filename
+
+if os.environ.get('CHESS_EVENTS'):
+    open_events(os.environ['CHESS_EVENTS'])
+
+def event(kind, **fields):
+    if events_fd is None:
+        return
+    record = dict(event=kind, timestamp=time.time(), pid=os.getpid(), **fields)
+    os.write(events_fd, (json.dumps(record, default=str) + '\n').encode())
+
+def new_game_id():
+    return f"{os.getpid()}-{next(game_numbers)}"
+
+def move_summary(side, move, info, elapsed):
+    """
+    Compact one line summary of a move, e.g. 'White e2e4 d4/6 11803n 0.512s cp +35 tb 3'.
+    """
+    phase = info.get('phase')
+    parts = [side, move.uci() if hasattr(move, 'uci') else str(move)]
+    if phase != 'search':
+        parts.append(f"({phase})")
+    if info.get('depth') is not None:
+        parts.append(f"d{info['depth']}" + (f"/{info['seldepth']}" if info.get('seldepth') else ''))
+    if info.get('nodes'):
+        parts.append(f"{info['nodes']}n")
+    parts.append(f"{elapsed:.3f}s")
+    if info.get('score') is not None:
+        parts.append(f"cp {info['score']:+}")
+    if info.get('tb_hits'):
+        parts.append(f"tb {info['tb_hits']}")
+    return ' '.join(parts)
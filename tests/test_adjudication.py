@@ -0,0 +1,32 @@
+import chess
+from adjudication import Adjudicator
+
+def test_resign_needs_both_sides_for_resign_moves():
+    adjudicator = Adjudicator(resign_score=500, resign_moves=2)
+    board = chess.Board()
+    results = [adjudicator.adjudicate(board, score) for score in (600, 700, 650, 800)]
+    assert results == [None, None, None, '1-0']
+
+def test_resign_count_restarts_when_the_score_drops():
+    adjudicator = Adjudicator(resign_score=500, resign_moves=2)
+    board = chess.Board()
+    results = [adjudicator.adjudicate(board, score) for score in (-600, -700, -100, -600, -700, -650, -800)]
+    assert results == [None] * 6 + ['0-1']
+
+def test_book_move_resets_the_counts():
+    adjudicator = Adjudicator(resign_score=500, resign_moves=1)
+    board = chess.Board()
+    assert adjudicator.adjudicate(board, 600) is None
+    assert adjudicator.adjudicate(board, None) is None
+    assert adjudicator.adjudicate(board, 600) is None
+    assert adjudicator.adjudicate(board, 600) == '1-0'
+
+def test_draw_only_after_draw_after():
+    adjudicator = Adjudicator(draw_score=10, draw_moves=2, draw_after=40)
+    board = chess.Board()
+    board.fullmove_number = 40
+    assert [adjudicator.adjudicate(board, 0) for _ in range(4)] == [None] * 4
+    board.fullmove_number = 41
+    assert [adjudicator.adjudicate(board, score) for score in (5, -5, 10, 0)] == [None, None, None, '1/2-1/2']
+    adjudicator.reset()
+    assert [adjudicator.adjudicate(board, score) for score in (5, 50, 0, 0, 0)] == [None] * 5
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+import chess
+import pytest
+from analysis_client import AnalysisClient
+from analysis_server import AnalysisServer
+
+@pytest.fixture
+def server(tmp_path):
+    """
+    A one-worker server on a Unix socket, run by an event loop in a thread: (client, server).
+    """
+    path = str(tmp_path / 'analysis.sock')
+    started = threading.Event()
+    servers = []
+
+    async def serve():
+        server = AnalysisServer(workers=1, budget=5)
+        server.start()
+        servers.append(server)
+        listener = await asyncio.start_unix_server(server.handle, path)
+        started.set()
+        async with listener:
+            await listener.serve_forever()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    assert started.wait(10)
+    yield AnalysisClient(unix_path=path, timeout=30), servers[0]
+    for worker in servers[0].workers:
+        worker.process.kill()
+
+def test_analyse(server):
+    client, _ = server
+    status, result = client.analyse(chess.STARTING_FEN, depth=2)
+    assert status == 200
+    assert chess.Move.from_uci(result['move']) in chess.Board().legal_moves
+    assert result['depth'] == 2 and not result['cancelled']
+    assert isinstance(result['score'], int) and result['mate'] is None
+
+def test_mate_score(server):
+    client, _ = server
+    status, result = client.analyse('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1', depth=3)
+    assert (status, result['move'], result['mate']) == (200, 'a1a8', 1)
+
+def test_cancel_stops_only_its_own_request(server):
+    client, _ = server
+    messages = []
+    done = threading.Event()
+
+    def stream():
+        messages.extend(client.stream(chess.STARTING_FEN, movetime=5, request_id='long'))
+        done.set()
+
+    threading.Thread(target=stream, daemon=True).start()
+    while not messages:
+        time.sleep(0.01)
+    start_time = time.time()
+    assert client.cancel('long') == (200, {'cancelled': True})
+    assert done.wait(4)
+    assert time.time() - start_time < 4
+    assert messages[-1]['type'] == 'done' and messages[-1]['cancelled']
+
+    # A cancel that arrives late, once the next request is running, must not stop it
+    server[1].workers[0].cancels.put('long')
+    status, result = client.analyse(chess.STARTING_FEN, depth=3)
+    assert status == 200 and result['depth'] == 3 and not result['cancelled']
+
+def test_dead_worker_is_replaced(server):
+    client, analysis_server = server
+    results = []
+    thread = threading.Thread(target=lambda: results.append(client.analyse(chess.STARTING_FEN, movetime=5)),
+                              daemon=True)
+    thread.start()
+    while analysis_server.workers[0].request_id is None:
+        time.sleep(0.01)
+    analysis_server.workers[0].process.kill()
+    thread.join(4)
+    status, result = results[0]
+    assert status == 500 and 'worker died' in result['error']
+    status, result = client.analyse(chess.STARTING_FEN, depth=2)
+    assert status == 200 and result['move']
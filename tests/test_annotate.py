@@ -0,0 +1,16 @@
+import pytest
+from annotate import annotate_game, blunder, classify, inaccuracy, max_loss, mistake
+
+@pytest.mark.parametrize('loss, judgement', [(0, None), (inaccuracy - 1, None), (inaccuracy, 'inaccuracy'),
+                                             (mistake, 'mistake'), (blunder - 1, 'mistake'), (blunder, 'blunder'),
+                                             (max_loss, 'blunder')])
+def test_classify(loss, judgement):
+    assert classify(loss) == judgement
+
+def test_fools_mate():
+    _, pgn, records = annotate_game((0, '1. f3 e5 2. g4 Qh4# 0-1', 2, None))
+    g4, mate = records[2], records[3]
+    assert (g4['move'], g4['loss'], g4['judgement']) == ('g4', max_loss, 'blunder')
+    assert (mate['move'], mate['loss'], mate['judgement']) == ('Qh4#', 0, None)
+    assert '[%eval #-1]' in pgn and 'Qh4# { [%eval #0] }' in pgn
+    assert all(0 <= record['loss'] <= max_loss for record in records)
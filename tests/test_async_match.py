@@ -0,0 +1,14 @@
+from async_match import stockfish_opponent
+from headless import harnesses
+from opponents import stockfish_defaults
+
+def test_stockfish_opponents_match_the_harnesses():
+    for harness in harnesses:
+        opponent = stockfish_opponent(harness)
+        if harness == 'v1v2':
+            assert opponent is None
+            continue
+        path, settings = opponent
+        assert path == 'stockfish'
+        assert settings == dict(stockfish_defaults, **{'Skill Level': harnesses[harness]['opponent'].keywords['skill_level']})
+    assert stockfish_opponent('v3-warm')[1]['Skill Level'] == 4
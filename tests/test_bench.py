@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+import aiv3
+from bench import bench, bench_positions
+
+def test_bench_signature(monkeypatch):
+    monkeypatch.setattr(aiv3, 'transposition_table', None)
+    monkeypatch.setattr(aiv3, 'eval_cache', None)
+    nodes, _ = bench(2)
+    assert nodes == 10733  # Change it only with a change that is meant to alter the search
+    assert bench(1, bench_positions[:1])[0] == 21
+
+def test_depth_below_1_is_rejected():
+    process = subprocess.run([sys.executable, 'bench.py', '--depth', '0'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(aiv3.__file__)))
+    assert process.returncode == 2 and 'depth must be at least 1' in process.stderr
@@ -0,0 +1,41 @@
+import os
+import chess
+import pytest
+from book import OpeningBook, polyglot_directory
+
+book_filename = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), polyglot_directory, 'Elo2400.bin')
+pytestmark = pytest.mark.skipif(not os.path.exists(book_filename), reason="needs the Polyglot books")
+
+# Legal, but no book has it
+out_of_book = chess.Board()
+out_of_book.push_san('a3')
+out_of_book.push_san('h6')
+out_of_book.push_san('h3')
+out_of_book.push_san('a6')
+
+def test_book_move():
+    book = OpeningBook([book_filename])
+    assert book.probe(chess.Board()) in chess.Board().legal_moves
+    assert book.in_book
+
+def test_misses_leave_book_until_reset():
+    book = OpeningBook([book_filename], max_misses=2)
+    assert book.probe(out_of_book) is None
+    assert book.in_book and book.misses == 1
+    assert book.probe(out_of_book) is None
+    assert not book.in_book
+    probes = book.probes
+    assert book.probe(chess.Board()) is None  # Not even the start position is looked up any more
+    assert (book.probes, book.skipped) == (probes, 1)
+
+    book.reset()
+    assert book.in_book and book.misses == 0
+    assert book.probe(chess.Board()) is not None
+
+def test_a_hit_resets_the_miss_count():
+    book = OpeningBook([book_filename], max_misses=2)
+    book.probe(out_of_book)
+    book.probe(chess.Board())
+    assert book.misses == 0
+    book.probe(out_of_book)
+    assert book.in_book
@@ -0,0 +1,18 @@
+import argparse
+import chess
+import pytest
+from perft import perft, positions, positive_depth, run_perft
+
+@pytest.mark.parametrize('name', sorted(positions))
+def test_depth_2(name):
+    fen, counts = positions[name]
+    assert perft(chess.Board(fen), 2) == counts[1]
+
+def test_divide_adds_up():
+    fen, counts = positions['kiwipete']
+    nodes, _, ok = run_perft(fen, 2, expected=counts[1], show_divide=True)
+    assert (nodes, ok) == (counts[1], True)
+
+def test_depth_below_1_is_rejected():
+    with pytest.raises(argparse.ArgumentTypeError):
+        positive_depth('0')
@@ -0,0 +1,43 @@
+import json
+import chess
+import pytest
+from results import game_record, open_store, summarize
+
+def record(config, game_index, result='1-0', ai_color=chess.WHITE):
+    moves = [{'color': 'white', 'move': 'e2e4', 'time': 0.1, 'phase': 'book'},
+             {'color': 'black', 'move': 'e7e5', 'time': 0.2, 'phase': 'search'}]
+    board = chess.Board()
+    for move in moves:
+        board.push_uci(move['move'])
+    return game_record(config, game_index, ai_color, None, board, result, moves)
+
+@pytest.mark.parametrize('name', ['games.jsonl', 'games.db'])
+def test_a_game_saved_again_replaces_the_first(tmp_path, name):
+    store = open_store(str(tmp_path / name))
+    store.add(record('a', 0, '0-1'))
+    store.add(record('a', 1))
+    store.add(record('b', 0))
+    store.add(record('a', 0, '1-0'))
+    assert sorted((game['config'], game['game'], game['result']) for game in store.games()) == \
+        [('a', 0, '1-0'), ('a', 1, '1-0'), ('b', 0, '1-0')]
+    assert [game['game'] for game in store.games('b')] == [0]
+    store.close()
+
+def test_resume_after_a_partial_line(tmp_path):
+    filename = tmp_path / 'games.jsonl'
+    store = open_store(str(filename))
+    store.add(record('a', 0))
+    with open(filename, 'a') as f:
+        f.write(json.dumps(record('a', 1))[:40])  # The process died in the middle of a write
+    store.add(record('a', 1, '0-1'))
+    store.add(record('a', 2))
+    assert [(game['game'], game['result']) for game in store.games('a')] == [(0, '1-0'), (1, '0-1'), (2, '1-0')]
+
+def test_summarize(tmp_path):
+    store = open_store(str(tmp_path / 'games.jsonl'))
+    store.add(record('a', 0, '1-0', chess.WHITE))
+    store.add(record('a', 1, '1/2-1/2', chess.BLACK))
+    stats, pentanomial = summarize(store)['a']
+    assert (stats.games_played, stats.wins, stats.draws) == (2, 1, 1)
+    assert stats.move_count == 2 and stats.moves == []  # Only totals are kept
+    assert pentanomial.counts == [0, 0, 0, 1, 0]
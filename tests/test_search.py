@@ -0,0 +1,23 @@
+import chess
+import pytest
+import aiv3
+from timeman import TimeManager
+
+checkmate = 'rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3'
+stalemate = '7k/5Q2/6K1/8/8/8/8/8 b - - 0 1'
+
+@pytest.mark.parametrize('fen', [checkmate, stalemate])
+def test_finished_position_has_no_move(fen):
+    board = chess.Board(fen)
+    for time_manager in (None, TimeManager.from_movetime(1)):
+        score, move, stats = aiv3.search(board, 2, time_manager)
+        assert move is None
+        assert score == aiv3.evaluate_board(board)
+    assert board.fen() == fen
+
+def test_fixed_depth_stats():
+    _, move, stats = aiv3.search(chess.Board(), 2)
+    assert move in chess.Board().legal_moves
+    assert stats.depth == 2
+    assert stats.nodes > 20
+    assert 'qnodes' not in stats.summary()
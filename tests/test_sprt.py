@@ -0,0 +1,19 @@
+import pytest
+from sprt import Pentanomial, Sprt
+
+def test_llr_known_value():
+    pentanomial = Pentanomial()
+    for pair_score, count in zip((0, 0.5, 1, 1.5, 2), (1, 1, 2, 4, 2)):
+        for _ in range(count):
+            pentanomial.add(pair_score)
+    # Mean 0.625 and variance 0.090625 per game; the scores of 0 and 5 Elo are 0.5 and 0.507195
+    assert pentanomial.mean_variance() == pytest.approx((0.625, 0.090625))
+    assert pentanomial.llr(0, 5) == pytest.approx(0.0963863, abs=1e-6)
+
+def test_sprt_waits_for_min_pairs():
+    sprt = Sprt(min_pairs=10)
+    for _ in range(9):
+        sprt.add(2)
+    assert sprt.status() is None
+    sprt.add(2)
+    assert sprt.status() == 'H1'
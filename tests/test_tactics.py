@@ -0,0 +1,39 @@
+import chess
+from tactics import is_solution, load_suite, print_summary, solve
+
+# Back rank mate in one for White
+mate_in_one = '6k1/5ppp/8/8/8/8/8/R5K1 w - -'
+
+def test_load_suite(tmp_path):
+    filename = tmp_path / 'suite.epd'
+    filename.write_text(f'# Comment\n\n{mate_in_one} bm Ra8#; id "mate.1";\n'
+                        f'{chess.STARTING_BOARD_FEN} w KQkq - am f3;\n'
+                        f'{chess.STARTING_BOARD_FEN} w KQkq - id "no.operation";\n')
+    suite = load_suite(filename)
+    assert [position_id for position_id, _, _, _ in suite] == ['mate.1', '4']  # Line number without an id
+    _, board, best_moves, avoid_moves = suite[0]
+    assert board.fen() == chess.Board(mate_in_one).fen()
+    assert best_moves == [chess.Move.from_uci('a1a8')] and avoid_moves == []
+    assert suite[1][3] == [chess.Move.from_uci('f2f3')]
+
+def test_is_solution():
+    e4, d4, f3 = (chess.Move.from_uci(uci) for uci in ('e2e4', 'd2d4', 'f2f3'))
+    assert is_solution(e4, [e4, d4], [])
+    assert not is_solution(f3, [e4, d4], [])
+    assert is_solution(e4, [], [f3])
+    assert not is_solution(f3, [], [f3])
+    assert not is_solution(None, [e4], [])
+
+def test_solve(capsys):
+    board = chess.Board(mate_in_one)
+    result = solve(('mate.1', board, [chess.Move.from_uci('a1a8')], [], 2, None))
+    assert result['move'] == 'Ra8#' and result['expected'] == 'Ra8#'
+    assert result['solved'] and result['solution_depth'] <= result['depth'] <= 2
+    assert result['solution_nodes'] <= result['nodes']
+
+    failed = solve(('mate.1', board, [], [chess.Move.from_uci('a1a8')], 2, None))
+    assert not failed['solved'] and failed['expected'] == 'not Ra8#'
+    assert failed['solution_depth'] is None
+
+    print_summary([result, failed])
+    assert 'Solved: 1/2 (50.0%)' in capsys.readouterr().out
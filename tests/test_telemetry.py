@@ -0,0 +1,53 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import chess
+import telemetry
+
+def test_events(tmp_path, monkeypatch):
+    filename = tmp_path / 'events.jsonl'
+    monkeypatch.setattr(telemetry, 'events_fd', None)
+    monkeypatch.delenv('CHESS_EVENTS', raising=False)
+    telemetry.event('move', ply=1)  # Not open yet: nothing is written
+    telemetry.open_events(str(filename))
+    try:
+        assert os.environ['CHESS_EVENTS'] == str(filename)
+        telemetry.event('move', ply=1, move=chess.Move.from_uci('e2e4'))
+        telemetry.event('game', result='1-0')
+    finally:
+        os.close(telemetry.events_fd)
+    records = [json.loads(line) for line in filename.read_text().splitlines()]
+    assert [record['event'] for record in records] == ['move', 'game']
+    assert records[0]['move'] == 'e2e4' and records[0]['pid'] == os.getpid()
+    assert records[1]['result'] == '1-0'
+
+def test_move_summary():
+    info = {'phase': 'search', 'depth': 4, 'seldepth': 6, 'nodes': 11803, 'score': 35, 'tb_hits': 3}
+    move = chess.Move.from_uci('e2e4')
+    assert telemetry.move_summary('White', move, info, 0.5123) == 'White e2e4 d4/6 11803n 0.512s cp +35 tb 3'
+    assert telemetry.move_summary('Black', move, {'phase': 'book'}, 0.0) == 'Black e2e4 (book) 0.000s'
+
+def test_game_ids_unique():
+    assert telemetry.new_game_id() != telemetry.new_game_id()
+
+def test_log_to(monkeypatch):
+    handler = telemetry.log.handlers[0]
+    monkeypatch.setattr(telemetry.log, 'handlers', [handler])  # Without pytest's capturing handlers
+    stream = io.StringIO()
+    previous = handler.stream
+    telemetry.log_to(stream)
+    try:
+        telemetry.log.warning("to the stream")
+    finally:
+        telemetry.log_to(previous)
+    assert stream.getvalue() == "to the stream\n"
+
+def test_unknown_log_level():
+    environment = dict(os.environ, CHESS_LOG_LEVEL='bogus')
+    environment.pop('CHESS_EVENTS', None)
+    output = subprocess.run([sys.executable, '-c', 'import telemetry; print(telemetry.log.level)'],
+                            cwd=os.path.dirname(os.path.abspath(telemetry.__file__)), env=environment,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.splitlines() == ["Unknown CHESS_LOG_LEVEL 'bogus', logging at INFO", '20']
@@ -0,0 +1,31 @@
+import chess
+import pytest
+from timecontrol import ChessClock, TimeControl, flag_result
+
+def test_parse():
+    time_control = TimeControl.parse('40/120+0.5')
+    assert (time_control.moves, time_control.base, time_control.increment) == (40, 120, 0.5)
+    assert str(time_control) == '40/120+0.5'
+
+def test_increment_is_added_after_each_move():
+    clock = ChessClock(TimeControl(10, 0.5))
+    assert clock.punch(chess.WHITE, 2)
+    assert clock.remaining[chess.WHITE] == pytest.approx(8.5)
+    assert clock.remaining[chess.BLACK] == 10
+    assert clock.limits(chess.BLACK) == {'wtime': 8.5, 'btime': 10, 'winc': 0.5, 'binc': 0.5, 'movestogo': None}
+
+def test_new_period_after_moves_per_period():
+    clock = ChessClock(TimeControl(10, moves=2))
+    assert clock.moves_to_go(chess.WHITE) == 2
+    clock.punch(chess.WHITE, 1)
+    assert clock.moves_to_go(chess.WHITE) == 1
+    clock.punch(chess.WHITE, 1)
+    assert clock.moves_to_go(chess.WHITE) == 2
+    assert clock.remaining[chess.WHITE] == pytest.approx(18)
+
+def test_flag_falls_without_increment():
+    clock = ChessClock(TimeControl(1, 5))
+    assert not clock.punch(chess.WHITE, 1.5)  # The increment comes too late
+    assert flag_result(chess.Board(), chess.WHITE) == '0-1'
+    assert flag_result(chess.Board('8/8/8/8/8/8/4k3/K6R w - - 0 1'), chess.BLACK) == '1-0'
+    assert flag_result(chess.Board('8/8/8/8/8/8/4k3/K7 w - - 0 1'), chess.WHITE) == '1/2-1/2'
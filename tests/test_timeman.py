@@ -0,0 +1,53 @@
+import chess
+from timeman import TimeManager, move_overhead
+
+def limits(wtime, movestogo=None, increment=0.0):
+    return {'wtime': wtime, 'btime': wtime, 'winc': increment, 'binc': increment, 'movestogo': movestogo}
+
+def test_soft_limit_within_hard_limit():
+    available = 60.0 - move_overhead
+    time_manager = TimeManager.from_limits(limits(60.0, movestogo=30), chess.Board())
+    assert time_manager.soft_limit == available / 30  # Full board: no middlegame bonus
+    assert time_manager.soft_limit <= time_manager.hard_limit <= available * 0.5
+    assert not time_manager.fixed
+
+def test_last_move_before_time_control():
+    available = 10.0 - move_overhead
+    time_manager = TimeManager.from_limits(limits(10.0, movestogo=1), chess.Board())
+    assert time_manager.hard_limit == available * 0.9
+    assert time_manager.soft_limit == time_manager.hard_limit
+
+def test_no_time_left():
+    time_manager = TimeManager.from_limits(limits(0.01), chess.Board())
+    assert time_manager.soft_limit == time_manager.hard_limit == 0.0
+
+def test_stops_past_soft_limit():
+    time_manager = TimeManager(10.0, 40.0)
+    move = chess.Move.from_uci('e2e4')
+    time_manager.start_time -= 5.0
+    assert not time_manager.iteration_done(move, 0)
+    time_manager.start_time -= 6.0
+    assert time_manager.iteration_done(move, 0)
+
+def test_unstable_best_move_stretches_soft_limit():
+    time_manager = TimeManager(10.0, 40.0)
+    time_manager.iteration_done(chess.Move.from_uci('e2e4'), 0)
+    time_manager.start_time -= 11.0
+    assert not time_manager.iteration_done(chess.Move.from_uci('d2d4'), 0)
+
+def test_no_iteration_that_cannot_finish():
+    time_manager = TimeManager(100.0, 30.0)
+    time_manager.start_time -= 11.0
+    assert time_manager.iteration_done(chess.Move.from_uci('e2e4'), 0)
+
+def test_fixed_movetime_has_no_soft_limit():
+    time_manager = TimeManager.from_movetime(5.0)
+    time_manager.start_time -= 100.0
+    assert time_manager.fixed
+    assert not time_manager.iteration_done(chess.Move.from_uci('e2e4'), 0)
+
+def test_forced():
+    time_manager = TimeManager.from_movetime(1.0)
+    assert time_manager.forced(chess.Board('k7/8/8/8/8/8/1R6/1R5K b - - 0 1'))  # Only Ka7
+    assert not time_manager.forced(chess.Board('k7/8/8/8/8/8/8/R6K b - - 0 1'))
+    assert not time_manager.forced(chess.Board())
@@ -0,0 +1,139 @@
+import multiprocessing
+import chess
+import pytest
+import aiv3
+from bench import bench_positions
+from ttable import EXACT, LOWER, UPPER, EvalCache, TranspositionTable, position_key, score_offset, search_tables
+
+def search_all(depth, positions):
+    return [aiv3.search(chess.Board(fen), depth)[:2] for fen in positions]
+
+def test_tables_leave_fixed_depth_results_unchanged(monkeypatch):
+    positions = bench_positions[:12]
+    monkeypatch.setattr(aiv3, 'transposition_table', None)
+    monkeypatch.setattr(aiv3, 'eval_cache', None)
+    without_tables = search_all(2, positions)
+
+    aiv3.transposition_table, aiv3.eval_cache = search_tables(1)
+    cold = search_all(2, positions)
+    warm = search_all(2, positions)
+    assert cold == without_tables
+    assert warm == without_tables
+
+def test_hash_file_round_trip(tmp_path):
+    filename = str(tmp_path / 'hash.bin')
+    table, cache = search_tables(1, filename)
+    key = position_key(chess.Board())
+    table.store(key, chess.Move.from_uci('e2e4'), -37, 5, EXACT)
+    cache.store(key, 25)
+    table.buffer.obj.flush()
+
+    table, cache = search_tables(1, filename)
+    assert table.probe(key) == (chess.Move.from_uci('e2e4'), -37, 5, EXACT)
+    assert cache.probe(key) == 25
+
+def test_hash_file_of_another_size_is_refused(tmp_path):
+    filename = tmp_path / 'hash.bin'
+    search_tables(1, str(filename))
+    size = filename.stat().st_size
+    with pytest.raises(ValueError):
+        search_tables(2, str(filename))
+    assert filename.stat().st_size == size
+
+def test_store_and_probe_round_trip():
+    table = TranspositionTable(1)
+    table.new_search()
+    key = position_key(chess.Board())
+    for move, score, bound in ((chess.Move.from_uci('e7e8q'), -score_offset, LOWER),
+                               (chess.Move.from_uci('g1f3'), 12345, UPPER), (None, 0, EXACT)):
+        table.store(key, move, score, 7, bound)
+        assert table.probe(key) == (move, score, 7, bound)
+    assert table.words[key % table.entries * 2 + 1] >> 50 == table.generation
+
+def test_bounds_are_distinct_and_nonzero():
+    assert len({EXACT, LOWER, UPPER}) == 3
+    assert all(0 < bound < 4 for bound in (EXACT, LOWER, UPPER))  # Two bits, 0 is an empty entry
+
+def test_replacement_keeps_deeper_entries_of_the_current_search():
+    table = TranspositionTable(1)
+    table.new_search()
+    key = 12345
+    other = key + table.entries  # Same slot, another position
+    table.store(key, None, 10, 6, EXACT)
+    table.store(other, None, 20, 2, EXACT)
+    assert table.probe(key) == (None, 10, 6, EXACT)
+    assert table.probe(other) is None
+    table.new_search()
+    table.store(other, None, 20, 2, EXACT)
+    assert table.probe(other) == (None, 20, 2, EXACT)
+
+def test_torn_entry_reads_as_a_miss():
+    table = TranspositionTable(1)
+    key = position_key(chess.Board())
+    table.store(key, chess.Move.from_uci('e2e4'), 30, 4, EXACT)
+    index = key % table.entries * 2
+    table.words[index] ^= 1 << 20  # Half of another process's write
+    assert table.probe(key) is None
+
+    cache = EvalCache(1)
+    cache.store(key, -250)
+    assert cache.probe(key) == -250
+    cache.words[key % cache.entries * 2 + 1] ^= 1
+    assert cache.probe(key) is None
+
+def probe_in_child(name, key, expected):
+    table = TranspositionTable.attach(name)
+    try:
+        if table.probe(key) != expected:
+            raise SystemExit(1)
+        table.store(key + 1, None, -1, 1, UPPER)
+    finally:
+        table.close()
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_attach_by_name_from_a_child_process():
+    table = TranspositionTable.create_shared(1)
+    key = position_key(chess.Board())
+    expected = (chess.Move.from_uci('d2d4'), -80, 3, LOWER)
+    table.store(key, *expected)
+    child = multiprocessing.get_context('fork').Process(target=probe_in_child, args=(table.name, key, expected))
+    child.start()
+    child.join()
+    try:
+        assert child.exitcode == 0
+        assert table.probe(key + 1) == (None, -1, 1, UPPER)
+    finally:
+        table.close(unlink=True)
+
+def test_warm_table_only_reuses_scores_of_the_same_depth_parity(monkeypatch):
+    fen = 'r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3'
+    monkeypatch.setattr(aiv3, 'transposition_table', None)
+    monkeypatch.setattr(aiv3, 'eval_cache', None)
+    without_tables = {depth: aiv3.search(chess.Board(fen), depth)[:2] for depth in (3, 4)}
+
+    aiv3.transposition_table, aiv3.eval_cache = search_tables(1)
+    assert aiv3.search(chess.Board(fen), 4)[:2] == without_tables[4]
+    # An odd depth ignores the even-depth entries left by the depth 4 search
+    assert aiv3.search(chess.Board(fen), 3)[:2] == without_tables[3]
+
+def test_hash_file_of_another_evaluation_starts_empty(tmp_path):
+    filename = str(tmp_path / 'hash.bin')
+    table, cache = search_tables(1, filename, eval_version=1)
+    key = position_key(chess.Board())
+    table.store(key, None, 10, 3, EXACT)
+    cache.store(key, 25)
+
+    table, cache = search_tables(1, filename, eval_version=1)
+    assert cache.probe(key) == 25
+    table, cache = search_tables(1, filename, eval_version=2)
+    assert table.probe(key) is None and cache.probe(key) is None
+
+def test_other_files_are_not_taken_for_hash_files(tmp_path):
+    filename = tmp_path / 'hash.bin'
+    filename.write_bytes(b'x' * (1024 * 1024 + 16))
+    with pytest.raises(ValueError):
+        search_tables(1, str(filename))
+    assert filename.read_bytes() == b'x' * (1024 * 1024 + 16)
+
+def test_evaluation_hash_is_stable():
+    assert aiv3.evaluation_hash() == aiv3.evaluation_hash()
@@ -0,0 +1,90 @@
+import io
+import chess
+import pytest
+import aiv3
+from uci import UciEngine
+
+@pytest.fixture
+def engine(monkeypatch):
+    # The engine installs its own tables in aiv3, put back the ones of the other tests afterwards
+    monkeypatch.setattr(aiv3, 'transposition_table', aiv3.transposition_table)
+    monkeypatch.setattr(aiv3, 'eval_cache', aiv3.eval_cache)
+    engine = UciEngine(io.StringIO())
+    engine.handle('setoption name OwnBook value false')
+    yield engine
+    engine.handle('quit')
+
+def output_lines(engine):
+    return engine.output.getvalue().splitlines()
+
+def test_position_startpos_moves(engine):
+    engine.handle('position startpos moves e2e4 e7e5 g1f3')
+    board = chess.Board()
+    for uci in ('e2e4', 'e7e5', 'g1f3'):
+        board.push_uci(uci)
+    assert engine.board == board
+
+def test_position_fen_moves(engine):
+    fen = '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1'
+    engine.handle(f'position fen {fen} moves e2e4')
+    board = chess.Board(fen)
+    board.push_uci('e2e4')
+    assert engine.board == board
+    engine.handle(f'position fen {fen}')
+    assert engine.board.fen() == fen
+
+def test_go_depth_reports_every_iteration(engine):
+    engine.handle('position startpos')
+    engine.handle('go depth 2')
+    engine.wait()
+    lines = output_lines(engine)
+    assert [line.split()[2] for line in lines if line.startswith('info depth')] == ['1', '2']
+    assert lines[-1].startswith('bestmove ')
+    assert chess.Move.from_uci(lines[-1].split()[1]) in chess.Board().legal_moves
+
+def test_go_clock_limits(engine):
+    engine.handle('position startpos moves e2e4')
+    engine.handle('go wtime 60000 btime 30000 winc 1000 binc 500 movestogo 20 depth 1')
+    engine.wait()
+    time_manager = engine.time_manager
+    assert not time_manager.fixed
+    assert 0 < time_manager.soft_limit <= time_manager.hard_limit < 30
+    assert output_lines(engine)[-1].startswith('bestmove ')
+
+def test_go_movetime_is_fixed(engine):
+    engine.handle('position startpos')
+    engine.handle('go movetime 50 depth 1')
+    engine.wait()
+    assert engine.time_manager.fixed
+    assert engine.time_manager.hard_limit == pytest.approx(0.05)
+
+def test_mate_is_reported_in_moves(engine):
+    engine.handle('position fen 6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1')
+    engine.handle('go depth 3')
+    engine.wait()
+    lines = output_lines(engine)
+    assert 'score mate 1' in lines[-2]
+    assert lines[-1] == 'bestmove a1a8'
+
+def test_malformed_commands_keep_the_engine_running(engine):
+    engine.handle('position startpos moves e2e4')
+    board = engine.board.copy()
+    for line in ('position startpos moves e7e5 e2e4', 'position fen not/a/fen w - - 0 1', 'position',
+                 'go wtime', 'go depth two'):
+        assert engine.handle(line)
+    assert engine.board == board
+    lines = output_lines(engine)
+    assert len(lines) == 5 and all(line.startswith('info string invalid') for line in lines)
+    engine.handle('go depth 1')
+    engine.wait()
+    assert output_lines(engine)[-1].startswith('bestmove ')
+
+@pytest.mark.parametrize('wdl, expected', [(2, 'score cp 10000'), (1, 'score cp ')])
+def test_tablebase_results_are_not_mates(engine, monkeypatch, wdl, expected):
+    # White wins (or, cursed, draws by the 50-move rule) whoever is to move
+    monkeypatch.setattr(aiv3, 'probe_tablebase', lambda board: wdl if board.turn == chess.WHITE else -wdl)
+    engine.handle('position fen 8/8/8/4k3/8/8/8/R3K3 w - - 0 1')
+    engine.handle('go depth 2')
+    engine.wait()
+    info = [line for line in output_lines(engine) if line.startswith('info depth')]
+    assert info and all(expected in line and 'mate' not in line for line in info)
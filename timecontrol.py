@@ -0,0 +1,71 @@
+"""
+Time controls and per-side chess clocks for the harnesses.
+
+A time control is written as [moves/]base[+increment] in seconds: '60+0.6' is one minute plus 0.6s per
+move, '40/120' is two minutes for every 40 moves.
+"""
+import chess
+
+class TimeControl:
+    def __init__(self, base, increment=0.0, moves=None):
+        self.base = base
+        self.increment = increment
+        self.moves = moves  # Moves per period, None for sudden death
+
+    @classmethod
+    def parse(cls, text):
+        moves = None
+        if '/' in text:
+            moves, text = text.split('/', 1)
+            moves = int(moves)
+        base, _, increment = text.partition('+')
+        return cls(float(base), float(increment or 0), moves)
+
+    def __str__(self):
+        text = f"{self.base:g}+{self.increment:g}" if self.increment else f"{self.base:g}"
+        return f"{self.moves}/{text}" if self.moves else text
+
+class ChessClock:
+    """
+    Remaining time of both sides. The limits dict handed to players has 'wtime', 'btime', 'winc', 'binc'
+    (seconds) and 'movestogo' (None for sudden death), like the arguments of the UCI go command.
+    """
+    def __init__(self, time_control):
+        self.time_control = time_control
+        self.remaining = {chess.WHITE: time_control.base, chess.BLACK: time_control.base}
+        self.moves_made = {chess.WHITE: 0, chess.BLACK: 0}
+
+    def moves_to_go(self, color):
+        if not self.time_control.moves:
+            return None
+        return self.time_control.moves - self.moves_made[color] % self.time_control.moves
+
+    def limits(self, color):
+        return {
+            'wtime': self.remaining[chess.WHITE],
+            'btime': self.remaining[chess.BLACK],
+            'winc': self.time_control.increment,
+            'binc': self.time_control.increment,
+            'movestogo': self.moves_to_go(color),
+        }
+
+    def punch(self, color, elapsed):
+        """
+        Charge a move to color's clock. Returns False if the flag fell.
+        """
+        self.remaining[color] -= elapsed
+        if self.remaining[color] < 0:
+            return False
+        self.remaining[color] += self.time_control.increment
+        self.moves_made[color] += 1
+        if self.time_control.moves and self.moves_made[color] % self.time_control.moves == 0:
+            self.remaining[color] += self.time_control.base
+        return True
+
+def flag_result(board, color):
+    """
+    Result when color runs out of time: a loss, unless the opponent can't possibly mate.
+    """
+    if board.has_insufficient_material(not color):
+        return '1/2-1/2'
+    return '0-1' if color == chess.WHITE else '1-0'
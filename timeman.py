@@ -0,0 +1,90 @@
+"""
+Time management: decides how long the engine may think about a move, given the clock.
+
+The soft limit is the time we aim to spend; iterative deepening doesn't start a new iteration past it.
+The hard limit is the deadline at which the search is aborted. The soft limit is stretched while the best
+move keeps changing between iterations or the score is dropping, and a forced move is played at once.
+A fixed move time has no soft limit: the search goes on until the deadline or its maximum depth.
+"""
+import time
+import chess
+
+move_overhead = 0.05  # Seconds kept in reserve per move for communication and bookkeeping
+
+def game_phase(board):
+    """
+    1.0 with all the pieces on the board, 0.0 with only kings and pawns.
+    """
+    material = sum(len(board.pieces(piece_type, color)) * value
+                   for piece_type, value in ((chess.KNIGHT, 1), (chess.BISHOP, 1), (chess.ROOK, 2), (chess.QUEEN, 4))
+                   for color in chess.COLORS)
+    return min(material, 24) / 24
+
+def expected_moves_left(board):
+    """
+    Guess of how many more moves we'll have to make when there is no movestogo.
+    """
+    return max(15, min(50, int(50 - board.fullmove_number * 0.4)))
+
+class TimeManager:
+    def __init__(self, soft_limit, hard_limit, fixed=False):
+        self.soft_limit = soft_limit
+        self.hard_limit = hard_limit
+        self.fixed = fixed  # A fixed move time, see from_movetime()
+        self.start_time = time.time()
+        self.instability = 0.0
+        self.best_move = None
+        self.score = None
+
+    @classmethod
+    def from_limits(cls, limits, board):
+        """
+        limits are the clock limits handed to players (see timecontrol.ChessClock).
+        """
+        remaining = limits['wtime'] if board.turn == chess.WHITE else limits['btime']
+        increment = limits['winc'] if board.turn == chess.WHITE else limits['binc']
+        available = max(0.0, remaining - move_overhead)
+        moves_to_go = limits['movestogo'] or expected_moves_left(board)
+
+        # Spend a little more in the middlegame, where most games are decided
+        phase_factor = 1.2 if 0.3 <= game_phase(board) <= 0.8 else 1.0
+        soft_limit = (available / moves_to_go + increment * 0.8) * phase_factor
+        hard_limit = min(available * 0.5 if moves_to_go > 1 else available * 0.9, soft_limit * 4)
+        soft_limit = min(soft_limit, hard_limit)
+        return cls(soft_limit, hard_limit)
+
+    @classmethod
+    def from_movetime(cls, movetime):
+        return cls(movetime, movetime, fixed=True)
+
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    @property
+    def deadline(self):
+        return self.start_time + self.hard_limit
+
+    def forced(self, board):
+        """
+        True when there is only one legal move, so there is nothing to think about.
+        """
+        return sum(1 for _ in board.legal_moves) <= 1
+
+    def iteration_done(self, best_move, score):
+        """
+        Called after each completed iteration with the best move and its score from the side to move's point
+        of view. Returns True when the search should not start another iteration.
+        """
+        self.instability *= 0.5
+        if self.best_move is not None and best_move != self.best_move:
+            self.instability += 1.0
+        scale = 1 + 0.5 * self.instability
+        if self.score is not None and score < self.score - 50:  # Score dropping: look for a way out
+            scale *= 1.5
+        self.best_move = best_move
+        self.score = score
+        if self.fixed:
+            return False
+        elapsed = self.elapsed()
+        # The next iteration takes several times longer than this one, don't start what can't finish
+        return elapsed > self.soft_limit * scale or elapsed * 3 > self.hard_limit
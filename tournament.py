@@ -0,0 +1,145 @@
+"""
+Round-robin or gauntlet tournament among registered engines (see engines.py), played over a pool of worker
+processes, with a crosstable and an Elo ladder at the end. Every pairing is played in pairs of games with
+colours reversed.
+
+    python tournament.py aiv1 aiv2 aiv3 stockfish0 stockfish4 --rounds 4
+    python tournament.py aiv3 stockfish0 stockfish4 stockfish8 --gauntlet --tc 60+0.6
+"""
+import argparse
+import itertools
+import math
+import multiprocessing
+import os
+import chess
+from adjudication import add_adjudication_arguments, adjudicator_from_args
+from engines import engines, get_engine
+from harness import play_game, score_for
+from openings import load_openings
+from timecontrol import TimeControl
+
+# Players of this worker process, built the first time an engine plays in it
+worker_players = {}
+worker_adjudicator = None
+worker_time_control = None
+
+def init_worker(adjudicator=None, time_control=None):
+    global worker_adjudicator, worker_time_control
+    worker_adjudicator = adjudicator
+    worker_time_control = time_control
+
+def worker_player(name):
+    if name not in worker_players:
+        worker_players[name] = get_engine(name)
+    return worker_players[name]
+
+def play_one(task):
+    game_index, white, black, opening_id, board = task
+    board = board or chess.Board()
+    result = play_game(worker_player(white), worker_player(black), board, adjudicator=worker_adjudicator,
+                       time_control=worker_time_control)
+    return game_index, white, black, opening_id, result
+
+def pairings(names, gauntlet=False):
+    """
+    Round robin: every engine against every other. Gauntlet: the first engine against each of the others.
+    """
+    if gauntlet:
+        return [(names[0], name) for name in names[1:]]
+    return list(itertools.combinations(names, 2))
+
+def schedule(names, rounds=1, gauntlet=False, openings=None):
+    """
+    Each round plays every pairing twice with colours reversed, from the same opening when there are openings.
+    """
+    game_index = 0
+    for _ in range(rounds):
+        for first, second in pairings(names, gauntlet):
+            if openings:
+                opening_id, board = openings[game_index // 2 % len(openings)]
+            else:
+                opening_id, board = None, None
+            for white, black in ((first, second), (second, first)):
+                yield game_index, white, black, opening_id, board.copy() if board else None
+                game_index += 1
+
+class Crosstable:
+    def __init__(self, names):
+        self.names = names
+        self.points = {name: {other: 0.0 for other in names} for name in names}
+        self.games = {name: {other: 0 for other in names} for name in names}
+
+    def add(self, white, black, result):
+        for player, opponent, color in ((white, black, chess.WHITE), (black, white, chess.BLACK)):
+            self.points[player][opponent] += score_for(result, color)
+            self.games[player][opponent] += 1
+
+    def total(self, name):
+        return sum(self.points[name].values()), sum(self.games[name].values())
+
+    def ratings(self, iterations=1000):
+        """
+        Bradley-Terry maximum likelihood ratings (draws count as half a win), scaled to Elo with the average at 0.
+        Every engine gets one virtual draw against each opponent it played, so a perfect score stays finite.
+        """
+        strength = {name: 1.0 for name in self.names}
+        for _ in range(iterations):
+            for name in self.names:
+                points = sum(self.points[name][other] + 0.5 for other in self.names if self.games[name][other])
+                weight = sum((self.games[name][other] + 1) / (strength[name] + strength[other])
+                             for other in self.names if self.games[name][other])
+                if weight:
+                    strength[name] = points / weight
+        elos = {name: 400 * math.log10(value) for name, value in strength.items()}
+        average = sum(elos.values()) / len(elos)
+        return {name: elo - average for name, elo in elos.items()}
+
+    def print_summary(self):
+        width = max(len(name) for name in self.names)
+        columns = [name[:6] for name in self.names]
+        print("Crosstable (points scored by the row engine):")
+        print(f"{'':<{width}}  " + ' '.join(f"{column:>7}" for column in columns) + f" {'score':>11}")
+        for name in self.names:
+            cells = [f"{'-':>7}" if name == other or not self.games[name][other]
+                     else f"{self.points[name][other]:>4g}/{self.games[name][other]:<2}" for other in self.names]
+            points, games = self.total(name)
+            print(f"{name:<{width}}  " + ' '.join(cells) + f" {points:>6g}/{games:<4}")
+
+        print("Elo ladder:")
+        ratings = self.ratings()
+        for rank, name in enumerate(sorted(self.names, key=ratings.get, reverse=True), 1):
+            points, games = self.total(name)
+            percentage = 100 * points / games if games else 0
+            print(f"{rank:>3}. {name:<{width}} {ratings[name]:>+7.0f}  {percentage:5.1f}% of {games} games")
+
+def run(names, rounds=1, gauntlet=False, workers=None, openings=None, adjudicator=None, time_control=None):
+    workers = workers or os.cpu_count()
+    crosstable = Crosstable(names)
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(adjudicator, time_control)) as pool:
+        tasks = schedule(names, rounds, gauntlet, openings)
+        for game_index, white, black, opening_id, result in pool.imap_unordered(play_one, tasks):
+            crosstable.add(white, black, result)
+            print(f"Game {game_index + 1}: {white} - {black}{' (' + opening_id + ')' if opening_id else ''}: {result}",
+                  flush=True)
+    crosstable.print_summary()
+    return crosstable
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a round-robin or gauntlet tournament among registered engines.")
+    parser.add_argument('engines', nargs='+', choices=sorted(engines), metavar='ENGINE',
+                        help=f"registered engines: {', '.join(sorted(engines))}")
+    parser.add_argument('--gauntlet', action='store_true', help="only play the first engine against each of the others")
+    parser.add_argument('--rounds', type=int, default=1, help="times every pairing is played (twice, colours reversed)")
+    parser.add_argument('--workers', type=int, help="number of worker processes (default: one per core)")
+    parser.add_argument('--tc', type=TimeControl.parse, help="time control [moves/]base[+increment] in seconds, e.g. 60+0.6")
+    parser.add_argument('--openings', help="EPD or PGN opening suite the pairs start from")
+    add_adjudication_arguments(parser)
+    args = parser.parse_args()
+
+    if len(set(args.engines)) != len(args.engines) or len(args.engines) < 2:
+        parser.error("give at least two different engines")
+    openings = load_openings(args.openings) if args.openings else None
+    run(args.engines, args.rounds, args.gauntlet, args.workers, openings, adjudicator_from_args(args), args.tc)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+Transposition table and evaluation cache packed into fixed-width integers, in a plain buffer, in shared memory
+or in a memory-mapped file, so that several worker processes search with the same tables and a table can be
+kept from one run to the next.
+
+Every entry is two 64-bit words: the position key XORed with the data, and the data. There are no locks; an
+entry torn by two processes writing at once no longer XORs back to its key and simply reads as a miss.
+The data word holds the best move (16 bits), the score (24), the depth (8), the bound (2) and the generation
+of the search that stored it (8). That is 16 bytes per position, against a few hundred for a dict entry.
+"""
+import atexit
+import mmap
+import os
+from multiprocessing import shared_memory
+import chess
+from telemetry import log
+
+EXACT, LOWER, UPPER = 1, 2, 3  # Bound of a stored score: exact, at least (fail high), at most (fail low)
+
+entry_size = 16
+header_size = entry_size  # Of a hash file: magic number and evaluation version
+file_magic = int.from_bytes(b'aiv3hash', 'little')
+score_offset = 1 << 23
+mask64 = (1 << 64) - 1
+
+def position_key(board):
+    """
+    64-bit key of the position (pieces, side to move, castling and en passant rights). Unlike hash() of
+    strings it is the same in every process and every run (of the same Python version).
+    """
+    return hash((board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings,
+                 board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK], board.turn,
+                 board.clean_castling_rights(), board.ep_square if board.has_legal_en_passant() else -1)) & mask64
+
+def pack_move(move):
+    if move is None:
+        return 0
+    return move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+
+def unpack_move(bits):
+    if not bits:
+        return None
+    return chess.Move(bits & 63, bits >> 6 & 63, bits >> 12 & 7 or None)
+
+class PackedTable:
+    """
+    Entries of two 64-bit words over a buffer: a bytearray, shared memory or a memory-mapped file.
+    """
+    def __init__(self, size_mb=16, buffer=None, shared=None):
+        """
+        A private table of size_mb megabytes, or a table over an existing buffer (see create_shared and attach).
+        """
+        if buffer is None:
+            buffer = bytearray(size_mb * 1024 * 1024 // entry_size * entry_size)
+        self.buffer = buffer
+        self.words = memoryview(buffer).cast('Q')
+        self.entries = len(self.words) // 2
+        self.shared = shared
+
+    @classmethod
+    def create_shared(cls, size_mb=16):
+        memory = shared_memory.SharedMemory(create=True, size=size_mb * 1024 * 1024 // entry_size * entry_size)
+        table = cls(buffer=memory.buf, shared=memory)
+        atexit.register(table.close, unlink=True)
+        return table
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Open a table created by create_shared() in a parent process. The creator unlinks it when it exits.
+        """
+        memory = shared_memory.SharedMemory(name=name)
+        return cls(buffer=memory.buf, shared=memory)
+
+    @property
+    def name(self):
+        return self.shared.name if self.shared else None
+
+    def clear(self):
+        for index in range(0, len(self.words), 1 << 16):
+            end = min(index + (1 << 16), len(self.words))
+            self.words[index:end] = memoryview(bytes((end - index) * 8)).cast('Q')
+
+    def usage(self, sample=1000):
+        """
+        Permille of entries in use, like UCI hashfull.
+        """
+        sample = min(sample, self.entries)
+        used = sum(1 for index in range(sample) if self.words[2 * index + 1])
+        return used * 1000 // sample if sample else 0
+
+    def close(self, unlink=False):
+        if self.shared is None:
+            return
+        self.words.release()
+        self.shared.close()
+        if unlink:
+            self.shared.unlink()
+        self.shared = None
+
+class TranspositionTable(PackedTable):
+    def __init__(self, size_mb=16, buffer=None, shared=None):
+        super().__init__(size_mb, buffer, shared)
+        self.generation = 0
+
+    def new_search(self):
+        self.generation = (self.generation + 1) & 0xFF
+
+    def probe(self, key):
+        """
+        Returns (move, score, depth, bound) or None.
+        """
+        index = key % self.entries * 2
+        data = self.words[index + 1]
+        if self.words[index] ^ data != key or not data:
+            return None
+        return (unpack_move(data & 0xFFFF), (data >> 16 & 0xFFFFFF) - score_offset, data >> 40 & 0xFF,
+                data >> 48 & 3)
+
+    def store(self, key, move, score, depth, bound):
+        index = key % self.entries * 2
+        old_data = self.words[index + 1]
+        # Keep a deeper entry of the current search, replace anything older
+        if old_data and old_data >> 50 & 0xFF == self.generation and old_data >> 40 & 0xFF > depth and \
+                self.words[index] ^ old_data != key:
+            return
+        score = max(-score_offset, min(score_offset - 1, int(score)))
+        data = (pack_move(move) | (score + score_offset) << 16 | min(depth, 255) << 40 | bound << 48 |
+                self.generation << 50)
+        self.words[index] = key ^ data
+        self.words[index + 1] = data
+
+class EvalCache(PackedTable):
+    """
+    Static evaluations by position: the key XORed with the score, and the score.
+    """
+    def probe(self, key):
+        index = key % self.entries * 2
+        data = self.words[index + 1]
+        if self.words[index] ^ data != key or not data:
+            return None
+        return data - score_offset
+
+    def store(self, key, score):
+        index = key % self.entries * 2
+        data = max(1, min(2 * score_offset - 1, int(score) + score_offset))
+        self.words[index] = key ^ data
+        self.words[index + 1] = data
+
+def search_tables(size_mb=16, filename=None, eval_version=0):
+    """
+    A transposition table and an evaluation cache sharing size_mb megabytes (three quarters for the table),
+    in memory or in a memory-mapped file. The file keeps what the searches learnt for the next run, and
+    processes that open the same file share the tables. Returns (TranspositionTable, EvalCache).
+
+    The file starts with a header holding eval_version, a fingerprint of the evaluation that filled it (see
+    aiv3.evaluation_hash()). Scores of another evaluation are stale, so the tables are emptied when it differs.
+    A file of another size is refused with ValueError rather than resized: another process may have it
+    mapped, and truncating it under that process would zero its tables or kill it with SIGBUS.
+    """
+    size = size_mb * 1024 * 1024 // entry_size * entry_size
+    split = size * 3 // 4 // entry_size * entry_size
+    if filename is None:
+        view = memoryview(bytearray(size))
+        return TranspositionTable(buffer=view[:split]), EvalCache(buffer=view[split:])
+
+    fd = os.open(filename, os.O_RDWR | os.O_CREAT)
+    try:
+        file_size = os.fstat(fd).st_size
+        if file_size == 0:  # New file
+            os.ftruncate(fd, header_size + size)
+        elif file_size != header_size + size:
+            raise ValueError(f"{filename} holds {file_size // (1024 * 1024)} MB of tables, not {size_mb} MB")
+        buffer = mmap.mmap(fd, header_size + size)
+    finally:
+        os.close(fd)
+    atexit.register(buffer.flush)
+    view = memoryview(buffer)
+    header = view[:header_size].cast('Q')
+    tables = TranspositionTable(buffer=view[header_size:header_size + split]), EvalCache(buffer=view[header_size + split:])
+    if header[0] not in (0, file_magic):
+        raise ValueError(f"{filename} is not a hash file")
+    if header[0] == file_magic and header[1] != eval_version:
+        log.warning(f"{filename} was filled by another evaluation, starting with empty tables")
+        for table in tables:
+            table.clear()
+    header[0], header[1] = file_magic, eval_version
+    return tables
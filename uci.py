@@ -0,0 +1,245 @@
+"""
+UCI front-end for the v3 engine (opening books, tablebases and time management included), so it can play
+under any UCI GUI or tournament manager.
+
+    python uci.py
+
+The search runs in a thread of its own so 'stop' and 'ponderhit' are handled while it thinks. The principal
+variation reported is the best move only, the search doesn't keep more than that.
+"""
+import math
+import sys
+import threading
+import time
+import chess
+import aiv3
+from book import OpeningBook
+from timeman import TimeManager
+from ttable import search_tables
+
+engine_name = 'aiv3'
+engine_author = 'ecs170project'
+max_search_depth = 64
+
+def uci_score(score, board, stats):
+    """
+    'cp N' or 'mate N' from the side to move's point of view, for a search score from White's.
+    """
+    sign = 1 if board.turn == chess.WHITE else -1
+    mate = aiv3.mate_in(score, stats)
+    if mate is not None:
+        return f"mate {mate * sign}"
+    return f"cp {aiv3.centipawns(score, board) * sign}"
+
+class UciEngine:
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.board = chess.Board()
+        self.book = OpeningBook()
+        self.options = {'Hash': 16, 'Threads': 1, 'OwnBook': True, 'SyzygyPath': '', 'KeepHash': False, 'HashFile': ''}
+        self.allocate_hash()  # Transposition table and evaluation cache, kept across games with KeepHash or HashFile
+        self.thread = None
+        self.time_manager = None
+        self.pondering = False
+        self.infinite = False
+        self.released = threading.Event()  # Set when an infinite or ponder search may report its move
+
+    def send(self, line):
+        with self.output_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def handle(self, line):
+        """
+        Handle one command line. Returns False on 'quit'.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+        if command == 'uci':
+            self.send(f"id name {engine_name}")
+            self.send(f"id author {engine_author}")
+            self.send("option name Hash type spin default 16 min 1 max 1024")
+            self.send("option name Threads type spin default 1 min 1 max 1")
+            self.send("option name OwnBook type check default true")
+            self.send("option name SyzygyPath type string default <empty>")
+            self.send("option name KeepHash type check default false")
+            self.send("option name HashFile type string default <empty>")
+            self.send("option name Ponder type check default false")
+            self.send("uciok")
+        elif command == 'isready':
+            self.send("readyok")
+        elif command == 'setoption':
+            self.set_option(arguments)
+        elif command == 'ucinewgame':
+            self.wait()
+            self.board = chess.Board()
+            self.book.reset()
+            if not (self.options['KeepHash'] or self.options['HashFile']):
+                aiv3.transposition_table.clear()
+                aiv3.eval_cache.clear()
+        elif command == 'position':
+            self.wait()
+            try:
+                self.set_position(arguments)
+            except (ValueError, IndexError) as error:  # The position stays as it was
+                self.send(f"info string invalid position: {error or line}")
+        elif command == 'go':
+            self.wait()
+            try:
+                self.go(arguments)
+            except (ValueError, IndexError) as error:  # Nothing is searched, no bestmove
+                self.send(f"info string invalid go: {error or line}")
+        elif command == 'stop':
+            self.stop()
+        elif command == 'ponderhit':
+            self.ponderhit()
+        elif command == 'd':
+            self.send(str(self.board))
+            self.send(f"Fen: {self.board.fen()}")
+        elif command == 'quit':
+            self.stop()
+            return False
+        return True
+
+    def set_option(self, arguments):
+        # setoption name <name> [value <value>], names and values may contain spaces
+        text = ' '.join(arguments)
+        name, _, value = text.partition(' value ')
+        name = name.replace('name', '', 1).strip()
+        if name == 'Hash':
+            self.options[name] = int(value)
+            self.allocate_hash()
+        elif name == 'Threads':
+            self.options[name] = int(value)  # No parallel search yet, recorded only
+        elif name in ('OwnBook', 'KeepHash'):
+            self.options[name] = value.strip().lower() == 'true'
+        elif name == 'HashFile':
+            # A memory-mapped file: what is learnt in this session is there for the next one
+            self.options[name] = value.strip() if value.strip() != '<empty>' else ''
+            self.allocate_hash()
+        elif name == 'SyzygyPath':
+            self.options[name] = value.strip()
+            for directory in filter(None, value.strip().split(':')):
+                aiv3.tablebase.add_directory(directory)
+
+    def allocate_hash(self):
+        try:
+            hash_file = self.options['HashFile'] or None
+            aiv3.transposition_table, aiv3.eval_cache = search_tables(self.options['Hash'], hash_file, aiv3.evaluation_hash())
+        except ValueError as error:  # Not a hash file or one of another size, keep the tables in memory
+            self.send(f"info string {error}")
+            self.options['HashFile'] = ''
+            aiv3.transposition_table, aiv3.eval_cache = search_tables(self.options['Hash'])
+
+    def set_position(self, arguments):
+        if arguments[0] == 'startpos':
+            board = chess.Board()
+            rest = arguments[1:]
+        else:
+            fen_end = arguments.index('moves') if 'moves' in arguments else len(arguments)
+            board = chess.Board(' '.join(arguments[1:fen_end]))
+            rest = arguments[fen_end:]
+        if rest and rest[0] == 'moves':
+            for uci in rest[1:]:
+                board.push_uci(uci)
+        self.board = board
+
+    def go(self, arguments):
+        values = {}
+        flags = set()
+        index = 0
+        while index < len(arguments):
+            token = arguments[index]
+            if token in ('infinite', 'ponder'):
+                flags.add(token)
+                index += 1
+            elif token == 'searchmoves':
+                break  # Not supported, the whole move list is searched
+            else:
+                values[token] = int(arguments[index + 1])
+                index += 2
+
+        board = self.board.copy()
+        depth = values.get('depth', max_search_depth)
+        if 'movetime' in values:
+            time_manager = TimeManager.from_movetime(values['movetime'] / 1000)
+        elif 'wtime' in values or 'btime' in values:
+            limits = {
+                'wtime': values.get('wtime', 0) / 1000,
+                'btime': values.get('btime', 0) / 1000,
+                'winc': values.get('winc', 0) / 1000,
+                'binc': values.get('binc', 0) / 1000,
+                'movestogo': values.get('movestogo'),
+            }
+            time_manager = TimeManager.from_limits(limits, board)
+        else:
+            time_manager = TimeManager.from_movetime(math.inf)
+
+        self.infinite = 'infinite' in flags
+        self.pondering = 'ponder' in flags
+        self.released.clear()
+        if self.pondering:
+            # Think on the opponent's time: no limit until ponderhit, then the limits of this go command
+            self.ponder_limits = (time_manager.soft_limit, time_manager.hard_limit, time_manager.fixed)
+            time_manager = TimeManager.from_movetime(math.inf)
+        self.time_manager = time_manager
+        aiv3.stop_requested = False
+        self.thread = threading.Thread(target=self.think, args=(board, depth, time_manager, values.get('nodes')),
+                                       daemon=True)
+        self.thread.start()
+
+    def think(self, board, depth, time_manager, nodes):
+        move = None
+        if self.options['OwnBook'] and not self.pondering:
+            move = self.book.probe(board)
+        if move is None:
+            start_time = time.time()
+
+            def on_iteration(iteration_depth, score, best_move):
+                stats = aiv3.stats
+                elapsed = time.time() - start_time
+                self.send(f"info depth {iteration_depth} seldepth {stats.seldepth} score {uci_score(score, board, stats)} "
+                          f"nodes {stats.nodes} nps {int(stats.nodes / elapsed) if elapsed > 0 else 0} "
+                          f"hashfull {aiv3.transposition_table.usage()} time {int(elapsed * 1000)} "
+                          f"pv {best_move.uci() if best_move else ''}".rstrip())
+
+            _, move, _ = aiv3.search(board, depth, time_manager, on_iteration, nodes)
+        if self.infinite or self.pondering:
+            self.released.wait()  # The GUI decides when the move is reported
+        self.send(f"bestmove {move.uci() if move else '0000'}")
+
+    def stop(self):
+        aiv3.stop_requested = True
+        self.released.set()
+        self.wait()
+
+    def ponderhit(self):
+        if not self.pondering or self.thread is None:
+            return
+        # The move we pondered on was played: from now on the normal limits apply
+        self.pondering = False
+        soft_limit, hard_limit, fixed = self.ponder_limits
+        self.time_manager.start_time = time.time()
+        self.time_manager.soft_limit = soft_limit
+        self.time_manager.hard_limit = hard_limit
+        self.time_manager.fixed = fixed
+        aiv3.deadline = self.time_manager.deadline
+        if not self.infinite:
+            self.released.set()
+
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+def main():
+    engine = UciEngine()
+    for line in sys.stdin:
+        if not engine.handle(line.strip()):
+            break
+
+if __name__ == '__main__':
+    main()
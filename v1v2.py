@@ -4,6 +4,7 @@ import chess
 import random
 from aiv1 import Min as aiv1_Min, Max as aiv1_Max, evaluate_board as aiv1_evaluate_board, gen_children as aiv1_gen_children
 from aiv2 import minimax as aiv2_minimax, evaluate_board as aiv2_evaluate_board, piece_square_table as aiv2_piece_square_table, MAX as aiv2_MAX, MIN as aiv2_MIN
+from telemetry import event, log, new_game_id
 
 # Performance metrics
 ai1_wins = 0
@@ -89,6 +90,8 @@ DARK_GREEN = (118, 150, 86)
 LIGHT_GREEN = (238, 238, 210)
 
 board = chess.Board()
+game_id = new_game_id()
+event('game_start', game=game_id, fen=board.fen())
 running = True
 max_depth = 4
 fps = 60
@@ -116,43 +119,49 @@ while running and games_played < max_games:
             res = aiv1_Min(board, 0, -9999, 9999, max_depth)  # Depth is adjustable
         ai_move = res[1]
         if ai_move:
+            event('move', game=game_id, ply=board.ply(), player='aiv1', move=ai_move.uci(), phase='search')
             board.push(ai_move)
-            print(f"AI 1 {ai_move.uci()}")
+            log.info(f"AI 1 {ai_move.uci()}")
         else:
-            print("No valid AI 1 move found!")
+            log.warning("No valid AI 1 move found!")
     else:  # AI 2's turn
         legal_moves = list(board.legal_moves)
         _, ai_move = aiv2_minimax(max_depth, board.turn == chess.WHITE, aiv2_MIN, aiv2_MAX, board)
         if ai_move:
+            event('move', game=game_id, ply=board.ply(), player='aiv2', move=ai_move.uci(), phase='search')
             board.push(ai_move)
-            print(f"AI 2 {ai_move.uci()}")
+            log.info(f"AI 2 {ai_move.uci()}")
         else:
             ai_move = random.choice(legal_moves)
+            event('move', game=game_id, ply=board.ply(), player='aiv2', move=ai_move.uci(), phase='random')
             board.push(ai_move)
-            print(f"AI (random) {ai_move.uci()}")
+            log.info(f"AI (random) {ai_move.uci()}")
 
     if board.is_game_over():
         result = board.result()
         games_played += 1
+        event('game_end', game=game_id, result=result, reason='game over')
         if result == '1-0':
             if ai1_color == chess.WHITE:
-                print("AI 1 (White) won")
+                log.info("AI 1 (White) won")
                 ai1_wins += 1
             else:
-                print("AI 2 (White) won")
+                log.info("AI 2 (White) won")
                 ai2_wins += 1
         elif result == '0-1':
             if ai1_color == chess.BLACK:
-                print("AI 1 (Black) won")
+                log.info("AI 1 (Black) won")
                 ai1_wins += 1
             else:
-                print("AI 2 (Black) won")
+                log.info("AI 2 (Black) won")
                 ai2_wins += 1
         else:
-            print("The game was a draw")
+            log.info("The game was a draw")
             draws += 1
         
         board.reset()
+        game_id = new_game_id()
+        event('game_start', game=game_id, fen=board.fen())
 
         if games_played >= max_games:
             running = False
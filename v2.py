@@ -2,6 +2,7 @@ import pygame
 import os
 import chess
 import random
+from telemetry import log
 
 MAX, MIN = 100000, -100000
 
@@ -182,7 +183,7 @@ def move_piece():
     if square in selected_legal_moves:
         move = chess.Move(coords_to_square(*selected_position), square)
         board.push(move)
-        print(f"White {move.uci()}")
+        log.info(f"White {move.uci()}")
         if board.piece_at(square).piece_type == chess.PAWN and (chess.square_rank(square) == 0 or chess.square_rank(square) == 7):  # Check for pawn promotion
             board.remove_piece_at(square)
             x, y = graphical_coords_to_coords(pygame.mouse.get_pos())
@@ -409,20 +410,20 @@ while running:
         _, ai_move = minimax(max_depth, False, MIN, MAX, board)
         if ai_move:
             board.push(ai_move)
-            print(f"Black {ai_move.uci()}")
+            log.info(f"Black {ai_move.uci()}")
         else:
             ai_move = random.choice(list(board.legal_moves))
             board.push(ai_move)
-            print(f"Black (random) {ai_move.uci()}")
+            log.info(f"Black (random) {ai_move.uci()}")
     elif board.turn == chess.WHITE:  # AI plays as White
         _, ai_move = minimax(max_depth, True, MIN, MAX, board)
         if ai_move:
             board.push(ai_move)
-            print(f"White {ai_move.uci()}")
+            log.info(f"White {ai_move.uci()}")
         else:
             ai_move = random.choice(list(board.legal_moves))
             board.push(ai_move)
-            print(f"White (random) {ai_move.uci()}")
+            log.info(f"White (random) {ai_move.uci()}")
 
     pygame.display.flip()
 
@@ -5,6 +5,7 @@ from stockfish import Stockfish
 import random
 import time
 import matplotlib.pyplot as plt
+from telemetry import log
 
 # Initialize Stockfish engine using the pip-installed stockfish package
 stockfish = Stockfish()
@@ -251,11 +252,11 @@ while running and games_played < max_games:
         _, ai_move = minimax(max_depth, False, MIN, MAX, board)
         if ai_move:
             board.push(ai_move)
-            print(f"Black {ai_move.uci()}")
+            log.info(f"Black {ai_move.uci()}")
         else:
             ai_move = random.choice(legal_moves)
             board.push(ai_move)
-            print(f"Black (random) {ai_move.uci()}")
+            log.info(f"Black (random) {ai_move.uci()}")
             stop_move_timer(start_time)
 
     elif board.turn == chess.WHITE:  # Stockfish's turn
@@ -263,7 +264,7 @@ while running and games_played < max_games:
         result = stockfish.get_best_move()
         move = chess.Move.from_uci(result)
         board.push(move)
-        print(f"White {move.uci()}")
+        log.info(f"White {move.uci()}")
 
     if board.is_game_over():
         result = board.result()
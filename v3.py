@@ -1,31 +1,18 @@
-import pygame
 import os
 import chess
 import chess.syzygy
-import chess.polyglot
 import random
+from book import get_book_move, new_game
+from telemetry import counters, log
 
-# Initialize Syzygy tablebases
-tablebase = chess.syzygy.Tablebase()
-
-# Directory containing the Polyglot books
-polyglot_directory = 'polyglot-collection'
-polyglot_filenames = [
-    'Perfect2023.bin', 'Titans.bin', 'Book.bin', 'book2.bin', 'codekiddy.bin', 'baron30.bin',
-    'DCbook_large.bin', 'Elo2400.bin', 'final-book.bin', 'gm2001.bin',
-    'gm2600.bin', 'human.bin', 'komodo.bin', 'KomodoVariety.bin', 'Performance.bin', 'varied.bin'
-]
-polyglot_books = [os.path.join(polyglot_directory, filename) for filename in polyglot_filenames]
-
-def get_book_move(board):
-    for book_filename in polyglot_books:
-        try:
-            with chess.polyglot.open_reader(book_filename) as reader:
-                entry = reader.find(board)
-                return entry.move
-        except (KeyError, IndexError):
-            continue
-    return None
+# Syzygy tablebases, opened by the first evaluation
+tablebase = None
+
+def open_tablebase():
+    global tablebase
+    if tablebase is None:
+        tablebase = chess.syzygy.Tablebase()
+    return tablebase
 
 MAX, MIN = 10000, -10000
 
@@ -130,12 +117,12 @@ def evaluate_board(board):
         return MIN if board.turn else MAX
 
     # Check for endgame using Syzygy tablebases
-    with tablebase:
+    with open_tablebase() as tablebase:
         if not (board.has_castling_rights(chess.WHITE) or board.has_castling_rights(chess.BLACK) or board.has_legal_en_passant()):
             try:
                 wdl = tablebase.probe_wdl(board)
                 if wdl is not None:
-                    print("Syzygy tablebase used for evaluation.")
+                    counters['tablebase_hits'] += 1
                     return wdl * MAX  # Scale the WDL result to a large value
             except KeyError:
                 pass
@@ -189,9 +176,8 @@ def order_moves(board):
     return ordered_moves
 
 # Define the Piece class
-class Piece(pygame.sprite.Sprite):
+class Piece:
     def __init__(self, filename, cols, rows):
-        pygame.sprite.Sprite.__init__(self)
         self.pieces = {chess.Piece(pt, c): i for i, (c, pt) in enumerate([(c, pt) for c in (chess.WHITE, chess.BLACK) for pt in (chess.KING, chess.QUEEN, chess.BISHOP, chess.KNIGHT, chess.ROOK, chess.PAWN)])}
         self.spritesheet = pygame.image.load(filename).convert_alpha()
         self.cell_width = self.spritesheet.get_width() // cols
@@ -239,7 +225,7 @@ def move_piece():
     if square in selected_legal_moves:
         move = chess.Move(coords_to_square(*selected_position), square)
         board.push(move)
-        print(f"Human {move.uci()}")
+        log.info(f"Human {move.uci()}")
         if board.piece_at(square).piece_type == chess.PAWN and (chess.square_rank(square) == 0 or chess.square_rank(square) == 7):  # Check for pawn promotion
             board.remove_piece_at(square)
             x, y = graphical_coords_to_coords(pygame.mouse.get_pos())
@@ -324,104 +310,108 @@ def show_menu():
                     player_color = chess.BLACK
                     return
 
-# Initialize Pygame
-pygame.init()
-
-# Set up the display
-screen_size = 800
-square_size = screen_size // 8
-screen = pygame.display.set_mode((screen_size, screen_size))
-pygame.display.set_caption("Chess Board")
-
-# Load the chess pieces
-filename = os.path.join('res', 'pieces.png')
-chess_pieces = Piece(filename, 6, 2)
-
-# Define chess.com-like green colors
-DARK_GREEN = (118, 150, 86)
-LIGHT_GREEN = (238, 238, 210)
-
-board = chess.Board()
-running = True
-selected_piece = None
-selected_position = None
-selected_legal_moves = set()
-dragging = False
-mouse_pos = None
-max_depth = 4
-fps = 60
-clock = pygame.time.Clock()
-
-# Show the menu to choose who goes first
-player_color = None
-show_menu()
-
-# Game loop
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if selected_piece:
+if __name__ == '__main__':
+    import pygame  # Only needed to play, importing this module must not start anything
+
+    # Initialize Pygame
+    pygame.init()
+
+    # Set up the display
+    screen_size = 800
+    square_size = screen_size // 8
+    screen = pygame.display.set_mode((screen_size, screen_size))
+    pygame.display.set_caption("Chess Board")
+
+    # Load the chess pieces
+    filename = os.path.join('res', 'pieces.png')
+    chess_pieces = Piece(filename, 6, 2)
+
+    # Define chess.com-like green colors
+    DARK_GREEN = (118, 150, 86)
+    LIGHT_GREEN = (238, 238, 210)
+
+    board = chess.Board()
+    running = True
+    selected_piece = None
+    selected_position = None
+    selected_legal_moves = set()
+    dragging = False
+    mouse_pos = None
+    max_depth = 4
+    fps = 60
+    clock = pygame.time.Clock()
+
+    # Show the menu to choose who goes first
+    player_color = None
+    show_menu()
+
+    # Game loop
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if selected_piece:
+                    move_piece()
+                else:
+                    select_piece()
+            elif event.type == pygame.MOUSEBUTTONUP and dragging:
                 move_piece()
-            else:
-                select_piece()
-        elif event.type == pygame.MOUSEBUTTONUP and dragging:
-            move_piece()
-        elif event.type == pygame.MOUSEMOTION and dragging:
-            mouse_pos = pygame.mouse.get_pos()
+            elif event.type == pygame.MOUSEMOTION and dragging:
+                mouse_pos = pygame.mouse.get_pos()
 
-    draw_board()
-    draw_pieces_on_board()
+        draw_board()
+        draw_pieces_on_board()
 
-    if dragging:
-        draw_piece_dragged()
+        if dragging:
+            draw_piece_dragged()
 
-    pygame.display.flip()
+        pygame.display.flip()
 
-    if board.turn == player_color:
-        clock.tick(fps)
-        continue
+        if board.turn == player_color:
+            clock.tick(fps)
+            continue
 
-    if board.turn == chess.BLACK:  # AI plays as Black
-        book_move = get_book_move(board)
-        if book_move:
-            board.push(book_move)
-            print(f"Black (book) {book_move.uci()}")
-        else:
-            _, ai_move = minimax(max_depth, False, MIN, MAX, board)
-            if ai_move:
-                board.push(ai_move)
-                print(f"Black {ai_move.uci()}")
+        if board.turn == chess.BLACK:  # AI plays as Black
+            book_move = get_book_move(board)
+            if book_move:
+                board.push(book_move)
+                log.info(f"Black (book) {book_move.uci()}")
             else:
-                ai_move = random.choice(list(board.legal_moves))
-                board.push(ai_move)
-                print(f"Black (random) {ai_move.uci()}")
-    elif board.turn == chess.WHITE:  # AI plays as White
-        book_move = get_book_move(board)
-        if book_move:
-            board.push(book_move)
-            print(f"White (book) {book_move.uci()}")
-        else:
-            _, ai_move = minimax(max_depth, True, MIN, MAX, board)
-            if ai_move:
-                board.push(ai_move)
-                print(f"White {ai_move.uci()}")
+                _, ai_move = minimax(max_depth, False, MIN, MAX, board)
+                if ai_move:
+                    board.push(ai_move)
+                    log.info(f"Black {ai_move.uci()}")
+                else:
+                    ai_move = random.choice(list(board.legal_moves))
+                    board.push(ai_move)
+                    log.info(f"Black (random) {ai_move.uci()}")
+        elif board.turn == chess.WHITE:  # AI plays as White
+            book_move = get_book_move(board)
+            if book_move:
+                board.push(book_move)
+                log.info(f"White (book) {book_move.uci()}")
             else:
-                ai_move = random.choice(list(board.legal_moves))
-                board.push(ai_move)
-                print(f"White (random) {ai_move.uci()}")
-
-    if board.is_game_over():
-        result = board.result()
-        if result == '1-0':
-            print("Human (White) won" if player_color == chess.WHITE else "AI (White) won")
-        elif result == '0-1':
-            print("AI (Black) won" if player_color == chess.WHITE else "Human (Black) won")
-        else:
-            print("The game was a draw")
-        board.reset()
+                _, ai_move = minimax(max_depth, True, MIN, MAX, board)
+                if ai_move:
+                    board.push(ai_move)
+                    log.info(f"White {ai_move.uci()}")
+                else:
+                    ai_move = random.choice(list(board.legal_moves))
+                    board.push(ai_move)
+                    log.info(f"White (random) {ai_move.uci()}")
+
+        if board.is_game_over():
+            result = board.result()
+            if result == '1-0':
+                print("Human (White) won" if player_color == chess.WHITE else "AI (White) won")
+            elif result == '0-1':
+                print("AI (Black) won" if player_color == chess.WHITE else "Human (Black) won")
+            else:
+                print("The game was a draw")
+            board.reset()
+            new_game()
 
-    clock.tick(fps)
+        clock.tick(fps)
 
-pygame.quit()
+    pygame.quit()